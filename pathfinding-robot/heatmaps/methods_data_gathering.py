@@ -1,8 +1,21 @@
 from pathfinding_robot import *
+from pathfinding_robot_grid import grid_breadth_first_search, grid_uniform_cost_search, grid_astar_search
+from pathfinding_robot_jps import jump_point_search
+from pathfinding_robot_hpa import hierarchical_search
+from pathfinding_robot_dstar import dstar_lite_search
+from pathfinding_robot_landmarks import HeuristicTables
+from pathfinding_robot_heatmap import save_heatmap_image
+
+maze  = big_maze
+start = maze.start
+goal  = maze.goal
+maze.map[start[0]][start[1]] = START
+maze.map[goal[0]][goal[1]] = GOAL
 
 euclidean_heuristic = lambda node, goal=goal: euclidean(node, goal) # diagonal moves cost sqrt(2)
 manhattan_heuristic = lambda node, goal=goal: manhattan(node, goal) # diagonal moves cost 2
 diagonal_heuristic  = lambda node, goal=goal: diagonal(node, goal)  # diagonal moves cost 1
+landmark_heuristic  = lambda problem: HeuristicTables.from_problem(problem).alt_heuristic(problem.goal) # tables are cached on disk
 
 search_methods = {
     "depth_first_search" : 
@@ -11,6 +24,13 @@ search_methods = {
         (breadth_first_graph_search, breadth_first_search_for_vis),
     "astar_search" : 
         (astar_search, astar_search_for_vis),
+    "astar_search-landmarks" : 
+        (lambda problem: astar_search(problem, landmark_heuristic(problem)), 
+         lambda problem: astar_search_for_vis(problem, landmark_heuristic(problem))),
+    "bidirectional_breadth_first_search" : 
+        (bidirectional_breadth_first_search, bidirectional_breadth_first_search_for_vis),
+    "bidirectional_astar_search" : 
+        (bidirectional_astar_search, bidirectional_astar_search_for_vis),
     "best_first_search-manhattan" : 
         (lambda problem: best_first_graph_search(problem, manhattan_heuristic), 
          lambda problem: best_first_search_for_vis(problem, manhattan_heuristic)),
@@ -20,14 +40,20 @@ search_methods = {
     "best_first_search-diagonal" : 
         (lambda problem: best_first_graph_search(problem, diagonal_heuristic), 
          lambda problem: best_first_search_for_vis(problem, diagonal_heuristic)),
+    "grid_breadth_first_search" : 
+        (grid_breadth_first_search, grid_breadth_first_search),
+    "grid_uniform_cost_search" : 
+        (grid_uniform_cost_search, grid_uniform_cost_search),
+    "grid_astar_search" : 
+        (grid_astar_search, grid_astar_search),
+    "jump_point_search" : 
+        (jump_point_search, jump_point_search),
+    "hierarchical_search" : # NOTE the timing includes building the abstract graph
+        (hierarchical_search, hierarchical_search),
+    "dstar_lite_search" : 
+        (dstar_lite_search, dstar_lite_search),
 }
 
-maze  = big_maze
-start = maze.start
-goal  = maze.goal
-maze.map[start[0]][start[1]] = START
-maze.map[goal[0]][goal[1]] = GOAL
-
 # Problem set up
 problem = PathfindingRobotProblem(start, goal, maze.map)
 
@@ -39,7 +65,7 @@ for method_name, method in search_methods.items():
     node, reached = method[1](problem)
     seq = node.solution()
     
-    save_heatmap(start, goal, maze.map, reached, seq, f'{method_name}.png')
+    save_heatmap_image(start, goal, maze.map, reached, seq, f'{method_name}.png') # (no matplotlib figure is drawn)
     
     file_name = 'methods.data'
     f = open(file_name, 'a+')
@@ -0,0 +1,106 @@
+from pathfinding_robot_grid import (
+    Grid, grid_astar_search, # array-backed engine
+    distance_field, descend, component_labels # whole-map precomputations
+)
+from search import Problem
+
+from collections import defaultdict
+from multiprocessing import Pool
+
+"""Batch API to answer many (start, goal) queries on the same Maze, sharing the precomputed data"""
+
+# ______________________________________________________________________________
+
+class PathService:
+
+    """Answers path queries on a fixed maze. Connected-component labels are computed
+    once, so queries between disconnected cells are answered instantly, and goals that
+    are queried repeatedly get a reverse distance field, from which each path is read
+    in O(path length) instead of running a new search."""
+
+    """
+    Parameters
+      maze : Maze
+        map in which every query is answered (its start and goal are ignored)
+      diagonal_moves : bool
+        if True, the robot can also move diagonally (with unit cost)
+      field_threshold : int
+        goals with at least this many queries get a distance field
+      labels : np.ndarray
+        precomputed component_labels of the maze's grid (computed if None)
+    """
+    def __init__(self, maze, diagonal_moves=False, field_threshold=2, labels=None):
+        self.maze = maze
+        self.diagonal_moves = diagonal_moves
+        self.field_threshold = field_threshold
+        self.grid = Grid(maze.map, diagonal_moves)
+        self.labels = component_labels(self.grid) if labels is None else labels
+
+    def connected(self, start, goal):
+        label = self.labels[self.grid.cell(start)]
+        return label != 0 and label == self.labels[self.grid.cell(goal)]
+
+    def solve(self, start, goal):
+        """Sequence of actions (i.e. positions) from start to goal, like node.solution(),
+        or None if goal can't be reached."""
+        if not self.connected(start, goal):
+            return None
+        node, _ = grid_astar_search(Problem(start, goal), self.grid)
+        return node.solution()
+
+    def solve_goal(self, goal, starts):
+        """List with the solution of each (start, goal) query, for all starts."""
+        if len(starts) < self.field_threshold:
+            return [self.solve(start, goal) for start in starts]
+        grid = self.grid
+        dist = distance_field(grid, grid.cell(goal))
+        solutions = []
+        for start in starts:
+            cells = descend(grid, dist, grid.cell(start))
+            solutions.append(None if cells is None else grid.positions(cells[1:]))
+        return solutions
+
+    def solve_all(self, queries, processes=None, chunksize=16):
+        """List with the solution of each (start, goal) pair in queries, in order.
+        Queries are grouped by goal and the groups are answered by a pool of processes
+        (or in this process, if processes == 1)."""
+        solutions = [None] * len(queries)
+        groups = defaultdict(list) # goal -> [(index, start)]
+        for index, (start, goal) in enumerate(queries):
+            if self.connected(start, goal): # unreachable goals are answered right away
+                groups[goal].append((index, start))
+        tasks = list(groups.items())
+
+        if processes == 1:
+            answers = list(map(self._solve_group, tasks))
+        else:
+            with Pool(processes, initializer=_init_worker,
+                      initargs=(self.maze, self.diagonal_moves, self.field_threshold, self.labels)) as pool:
+                answers = list(pool.imap_unordered(_solve_group, tasks, chunksize))
+        for answer in answers:
+            for index, solution in answer:
+                solutions[index] = solution
+        return solutions
+
+    def _solve_group(self, task):
+        goal, indexed_starts = task
+        indexes, starts = zip(*indexed_starts)
+        return list(zip(indexes, self.solve_goal(goal, starts)))
+
+# ______________________________________________________________________________
+# Process pool workers (each one builds its own PathService, once)
+
+_worker_service = None
+
+def _init_worker(maze, diagonal_moves, field_threshold, labels):
+    global _worker_service
+    _worker_service = PathService(maze, diagonal_moves, field_threshold, labels)
+
+def _solve_group(task):
+    return _worker_service._solve_group(task)
+
+# ______________________________________________________________________________
+
+def solve_queries(maze, queries, diagonal_moves=False, processes=None):
+    """Answer all (start, goal) queries on maze, see PathService.solve_all."""
+    return PathService(maze, diagonal_moves).solve_all(queries, processes)
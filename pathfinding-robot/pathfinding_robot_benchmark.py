@@ -0,0 +1,122 @@
+from pathfinding_robot_problem import PathfindingRobotProblem
+from pathfinding_robot_maps import random_maze
+from pathfinding_robot_searches import failure
+from pathfinding_robot_grid import grid_breadth_first_search, grid_uniform_cost_search, grid_astar_search
+from pathfinding_robot_jps import jump_point_search
+from search import (
+    depth_first_graph_search, breadth_first_graph_search,
+    uniform_cost_search, greedy_best_first_graph_search, astar_search,
+    bidirectional_breadth_first_search, bidirectional_astar_search
+)
+
+from time import perf_counter
+import argparse
+import csv
+import json
+import tracemalloc
+
+"""Benchmark of the search algorithms on seeded random mazes.
+
+Each method is run a number of times on each maze size, and the wall time, the number
+of expanded nodes and the peak (Python) memory of the search are written to a CSV or JSON file.
+Usage: python pathfinding_robot_benchmark.py --sizes 64 256 1024 --output results.csv
+
+The tree searches, depth_limited_search, iterative_deepening_search and recursive_best_first_search
+from search.py aren't included, as they don't terminate (or hit the recursion limit) on grid mazes."""
+
+# ______________________________________________________________________________
+
+# name -> (method, how expanded nodes are counted: by calls to problem.actions or by the length of reached)
+benchmark_methods = {
+    "depth_first_graph_search" : (depth_first_graph_search, 'actions'),
+    "breadth_first_graph_search" : (breadth_first_graph_search, 'actions'),
+    "uniform_cost_search" : (uniform_cost_search, 'actions'),
+    "greedy_best_first_graph_search" :
+        (lambda problem: greedy_best_first_graph_search(problem, problem.h), 'actions'),
+    "astar_search" : (astar_search, 'actions'),
+    "bidirectional_breadth_first_search" : (bidirectional_breadth_first_search, 'actions'),
+    "bidirectional_astar_search" : (bidirectional_astar_search, 'actions'),
+    "grid_breadth_first_search" : (grid_breadth_first_search, 'reached'),
+    "grid_uniform_cost_search" : (grid_uniform_cost_search, 'reached'),
+    "grid_astar_search" : (grid_astar_search, 'reached'),
+    "jump_point_search" : (jump_point_search, 'reached'),
+}
+
+def run_once(method, counting, maze, diagonal_moves, trace_memory=False):
+    """Run method on a new problem for maze, returning (wall time, expanded nodes, solution length, peak memory)."""
+    problem = PathfindingRobotProblem(maze.start, maze.goal, maze.map, diagonal_moves)
+    expanded = 0
+    actions = problem.actions
+    def counting_actions(state):
+        nonlocal expanded
+        expanded += 1
+        return actions(state)
+    problem.actions = counting_actions
+
+    if trace_memory:
+        tracemalloc.start()
+    start_time = perf_counter()
+    result = method(problem)
+    end_time = perf_counter()
+    peak_memory = None
+    if trace_memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    node, reached = result if isinstance(result, tuple) else (result, None)
+    if counting == 'reached':
+        expanded = len(reached)
+    solution_length = None if node is None or node is failure else len(node.solution())
+    return end_time - start_time, expanded, solution_length, peak_memory
+
+def benchmark(method_names, sizes, wall_density=0.2, seed=0, repeats=3, diagonal_moves=False, log=print):
+    """List of result rows (dicts), one for each (method, size) pair.
+    Times are measured without tracing memory, which is measured on an extra run."""
+    rows = []
+    for size in sizes:
+        maze = random_maze(size, wall_density, seed)
+        for name in method_names:
+            method, counting = benchmark_methods[name]
+            times = []
+            for _ in range(repeats):
+                elapsed, expanded, solution_length, _ = run_once(method, counting, maze, diagonal_moves)
+                times.append(elapsed)
+            _, _, _, peak_memory = run_once(method, counting, maze, diagonal_moves, trace_memory=True)
+            row = {
+                'method': name, 'size': size, 'wall_density': wall_density, 'seed': seed,
+                'diagonal_moves': diagonal_moves, 'repeats': repeats,
+                'time_min_ms': 1000 * min(times), 'time_mean_ms': 1000 * sum(times) / repeats,
+                'expanded_nodes': expanded, 'solution_length': solution_length,
+                'peak_memory_bytes': peak_memory,
+            }
+            rows.append(row)
+            if log:
+                log('{method} ({size}x{size}): {time_min_ms:.2f}ms, {expanded_nodes} expanded nodes, '
+                    '{peak_memory_bytes} bytes'.format(**row))
+    return rows
+
+def save_results(rows, file_name):
+    """Save the rows as JSON if file_name ends with .json, else as CSV."""
+    with open(file_name, 'w', newline='') as f:
+        if file_name.endswith('.json'):
+            json.dump(rows, f, indent=2)
+        elif rows:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+# ______________________________________________________________________________
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the search algorithms on random mazes.')
+    parser.add_argument('--methods', nargs='+', default=list(benchmark_methods), choices=list(benchmark_methods))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[64, 128, 256], help='side of the (square) mazes')
+    parser.add_argument('--wall_density', type=float, default=0.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--diagonal_moves', action='store_true')
+    parser.add_argument('--output', default='benchmark.csv', help='.csv or .json file')
+    args = parser.parse_args()
+
+    rows = benchmark(args.methods, args.sizes, args.wall_density, args.seed, args.repeats, args.diagonal_moves)
+    save_results(rows, args.output)
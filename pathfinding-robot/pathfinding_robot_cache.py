@@ -0,0 +1,117 @@
+from pathfinding_robot_maps import WALL
+from search import Node, astar_search
+
+from collections import OrderedDict
+import hashlib
+
+import numpy as np
+
+"""Cache of path queries, for callers that repeat (start, goal) queries on the same map.
+
+Solutions are kept in LRU order, keyed by (map digest, diagonal moves, start, goal, algorithm,
+heuristic), so a changed map never returns stale paths, and the total number of stored states
+is bounded. A PathfindingRobotProblem's digest is its moves_digest, which is taken from the moves
+compiled when the problem is created (so it follows any change of the map's walls, and of the costs
+of a TerrainProblem), and is computed once per problem, in a single pass over its move bitmasks.
+For optimal algorithms, a cached path from s to goal also answers the queries from
+any state on it, since every suffix of a shortest path is a shortest path (optimal substructure)."""
+
+# ______________________________________________________________________________
+
+def map_digest(map):
+    """Hex digest of the map's walls (and shape), which changes whenever they do. START and GOAL
+    cells count as empty, so problems with different endpoints on the same maze share it."""
+    walls = np.asarray(map) == WALL
+    digest = hashlib.sha1(str(walls.shape).encode())
+    digest.update(np.packbits(walls).tobytes())
+    return digest.hexdigest()[:16]
+
+class PathCache:
+
+    """
+    Parameters
+      max_states : int
+        maximum number of states stored (summed over all cached paths), which bounds the memory used
+    """
+    def __init__(self, max_states=1000000):
+        self.max_states = max_states
+        self.entries = OrderedDict() # key -> list of the path's states (None if there's no solution), in LRU order
+        self.suffixes = {} # (key without start, state) -> key of a cached optimal path through state
+        self.size = 0 # number of stored states
+        self.hits = self.subpath_hits = self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.suffixes.clear()
+        self.size = 0
+
+    """
+    Parameters
+      problem : PathfindingRobotProblem
+        query to answer (any Problem with a map works, as long as its actions are its next states)
+      algorithm : function
+        search function called as algorithm(problem) or algorithm(problem, heuristic) on a miss
+      heuristic : function
+        heuristic given to algorithm (it's part of the key, so pass the same object on each query)
+      optimal : bool
+        if True, the algorithm's solutions are shortest paths, and queries from states on cached
+        paths to the same goal are answered with their suffixes
+      digest : str
+        digest of the map, for problems without moves_digest (else their map_digest is computed, which is O(map size))
+    """
+    def search(self, problem, algorithm=astar_search, heuristic=None, optimal=False, digest=None):
+        """Solution node like algorithm's (None if there's no solution)."""
+        if hasattr(problem, 'moves_digest'):
+            digest = problem.moves_digest()
+        else:
+            digest = digest or map_digest(problem.map)
+        query = (digest, getattr(problem, 'diagonal_moves', None), problem.goal, algorithm, heuristic)
+        key = (problem.initial,) + query
+
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.__node(problem, self.entries[key])
+        if optimal and (query, problem.initial) in self.suffixes:
+            self.subpath_hits += 1
+            path_key = self.suffixes[(query, problem.initial)]
+            self.entries.move_to_end(path_key)
+            states = self.entries[path_key]
+            return self.__node(problem, states[states.index(problem.initial):])
+
+        self.misses += 1
+        result = algorithm(problem) if heuristic is None else algorithm(problem, heuristic)
+        node = result[0] if isinstance(result, tuple) else result # (the *_for_vis ones return (node, reached))
+        states = None if node is None or node.state != problem.goal else [n.state for n in node.path()]
+        self.__store(key, query, states, optimal)
+        return node if states is not None else None
+
+    def __node(self, problem, states):
+        if states is None:
+            return None
+        node = Node(states[0])
+        for state in states[1:]:
+            node = node.child_node(problem, state)
+        return node
+
+    def __store(self, key, query, states, optimal):
+        self.entries[key] = states
+        self.size += 1 if states is None else len(states)
+        if optimal and states is not None:
+            for state in states:
+                self.suffixes.setdefault((query, state), key)
+        while self.size > self.max_states and len(self.entries) > 1:
+            self.__evict()
+
+    def __evict(self):
+        """Remove the least recently used path (and the suffixes that pointed to it)."""
+        key, states = self.entries.popitem(last=False)
+        self.size -= 1 if states is None else len(states)
+        if states is not None:
+            query = key[1:]
+            for state in states:
+                if self.suffixes.get((query, state)) == key:
+                    del self.suffixes[(query, state)]
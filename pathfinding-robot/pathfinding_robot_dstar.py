@@ -0,0 +1,189 @@
+from pathfinding_robot_grid import Grid
+from pathfinding_robot_searches import failure
+from search import SimpleProblemSolvingAgentProgram
+
+from heapq import heappush, heappop
+
+"""Incremental replanning with D* Lite (Koenig & Likhachev, 2002).
+
+The search runs backwards, from the goal to the robot, so that when the robot moves
+and some cells change (becoming walls or being freed) only the part of the search
+tree affected by the changes is repaired, instead of searching from scratch."""
+
+infinity = float('inf')
+
+# ______________________________________________________________________________
+
+class DStarLite:
+
+    """
+    Parameters
+      map : [[int]] or np.ndarray
+        matrix representing the labyrinth's map (see PathfindingRobotProblem)
+      start : (int, int)
+        robot's current position at the map
+      goal : (int, int)
+        goal position at the map
+      diagonal_moves : bool
+        if True, the robot can also move diagonally (with unit cost)
+    """
+    def __init__(self, map, start, goal, diagonal_moves=False):
+        self.grid = Grid(map, diagonal_moves)
+        self.start = self.grid.cell(start)
+        self.goal = self.grid.cell(goal)
+        self.last = self.start # robot's position at the last replanning
+        self.km = 0 # key modifier, accumulates the heuristic change as the robot moves
+
+        self.g = {} # missing cells have g = rhs = infinity
+        self.rhs = {self.goal: 0}
+        self.queued = {self.goal: self.key(self.goal)} # cell -> its current key in the frontier
+        self.frontier = [(self.queued[self.goal], self.goal)] # lazily deleted entries
+        self.reached = [] # cells expanded by the last compute_shortest_path
+
+    @classmethod
+    def from_problem(cls, problem):
+        return cls(problem.map, problem.initial, problem.goal, problem.diagonal_moves)
+
+    def h(self, a, b):
+        stride = self.grid.stride
+        (ai, aj), (bi, bj) = divmod(a, stride), divmod(b, stride)
+        di, dj = abs(ai - bi), abs(aj - bj)
+        return max(di, dj) if self.grid.diagonal_moves else di + dj
+
+    def key(self, cell):
+        m = min(self.g.get(cell, infinity), self.rhs.get(cell, infinity))
+        return (m + self.h(self.start, cell) + self.km, m)
+
+    def neighbours(self, cell):
+        """Free cells adjacent to cell (moving into a wall, or out of one, costs infinity)."""
+        free = self.grid.free
+        if not free[cell]:
+            return []
+        return [cell + offset for offset in self.grid.offsets if free[cell + offset]]
+
+    def __update_rhs(self, cell):
+        if cell != self.goal:
+            g = self.g
+            self.rhs[cell] = min([g.get(n, infinity) + 1 for n in self.neighbours(cell)], default=infinity)
+
+    def __update_vertex(self, cell):
+        if self.g.get(cell, infinity) != self.rhs.get(cell, infinity):
+            key = self.key(cell)
+            self.queued[cell] = key
+            heappush(self.frontier, (key, cell))
+        else:
+            self.queued.pop(cell, None)
+
+    def __top(self):
+        """(key, cell) with the lowest key in the frontier, skipping stale entries."""
+        frontier, queued = self.frontier, self.queued
+        while frontier and queued.get(frontier[0][1]) != frontier[0][0]:
+            heappop(frontier)
+        return frontier[0] if frontier else ((infinity, infinity), None)
+
+    def compute_shortest_path(self):
+        g, rhs, start = self.g, self.rhs, self.start
+        self.reached = []
+        while True:
+            k_old, cell = self.__top()
+            if cell is None or (k_old >= self.key(start) and rhs.get(start, infinity) <= g.get(start, infinity)):
+                break
+            k_new = self.key(cell)
+            if k_old < k_new:
+                self.queued[cell] = k_new
+                heappush(self.frontier, (k_new, cell))
+                continue
+            heappop(self.frontier)
+            del self.queued[cell]
+            self.reached.append(cell)
+            g_cell, rhs_cell = g.get(cell, infinity), rhs.get(cell, infinity)
+            if g_cell > rhs_cell: # overconsistent, the cost to the goal decreased
+                g[cell] = rhs_cell
+                for n in self.neighbours(cell):
+                    if n != self.goal and rhs_cell + 1 < rhs.get(n, infinity):
+                        rhs[n] = rhs_cell + 1
+                        self.__update_vertex(n)
+            else: # underconsistent, the cost to the goal increased
+                g[cell] = infinity
+                for n in self.neighbours(cell) + [cell]:
+                    if n == cell or rhs.get(n, infinity) == g_cell + 1:
+                        self.__update_rhs(n)
+                    self.__update_vertex(n)
+
+    def move_to(self, pos):
+        """Update the robot's position (the search tree is kept, as it's rooted at the goal)."""
+        self.start = self.grid.cell(pos)
+
+    """
+    Parameters
+      changes : [((int, int), int)]
+        list of (position, new value) of the cells of the map that changed,
+        e.g. [((3, 4), WALL), ((5, 2), EMPTY)]
+    """
+    def update_cells(self, changes):
+        self.km += self.h(self.last, self.start)
+        self.last = self.start
+        affected = set()
+        for pos, value in changes:
+            self.grid.set_cell(pos, value)
+            cell = self.grid.cell(pos)
+            affected.add(cell)
+            affected.update(cell + offset for offset in self.grid.offsets)
+        for cell in affected:
+            self.__update_rhs(cell)
+            self.__update_vertex(cell)
+
+    def solution(self):
+        """Sequence of actions (i.e. positions) from the robot's position to the goal,
+        like node.solution(), or None if the goal can't be reached."""
+        self.compute_shortest_path()
+        g, cell = self.g, self.start
+        if self.rhs.get(cell, infinity) == infinity: # (the search may stop before g(start) is set)
+            return None
+        cells = []
+        while cell != self.goal:
+            cell = min(self.neighbours(cell), key=lambda n: g.get(n, infinity))
+            cells.append(cell)
+        return self.grid.positions(cells)
+
+# ______________________________________________________________________________
+
+class ReplanningAgentProgram(SimpleProblemSolvingAgentProgram):
+
+    """Problem-solving agent that follows a DStarLite plan, repairing it whenever
+    a percept reports cells of the map that changed. Each percept is a tuple
+    (position, changes), with changes as in DStarLite.update_cells, and the
+    returned actions are the next positions to move to."""
+
+    def __init__(self, planner):
+        SimpleProblemSolvingAgentProgram.__init__(self, planner.grid.pos(planner.start))
+        self.planner = planner
+
+    def update_state(self, state, percept):
+        position, changes = percept
+        self.planner.move_to(position)
+        if changes:
+            self.planner.update_cells(changes)
+            self.seq = [] # forces replanning (which only repairs the search tree)
+        return position
+
+    def formulate_goal(self, state):
+        return self.planner.grid.pos(self.planner.goal)
+
+    def formulate_problem(self, state, goal):
+        return self.planner
+
+    def search(self, problem):
+        return problem.solution()
+
+# ______________________________________________________________________________
+
+def dstar_lite_search(problem):
+    """Plan with D* Lite (from scratch), returning (node, reached) like astar_search_for_vis."""
+    planner = DStarLite.from_problem(problem)
+    seq = planner.solution()
+    reached = planner.grid.positions(planner.reached)
+    if seq is None:
+        return (failure, reached)
+    grid = planner.grid
+    return (grid.path_of([planner.start] + [grid.cell(pos) for pos in seq]), reached)
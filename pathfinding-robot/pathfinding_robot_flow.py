@@ -0,0 +1,114 @@
+from pathfinding_robot_grid import Grid, distance_field
+from pathfinding_robot_searches import failure
+
+from collections import OrderedDict
+
+import numpy as np
+
+"""Flow fields: for a goal shared by many robots, a single reverse search from the goal
+gives each cell its distance to the goal and the next step of a shortest path from it,
+so every robot follows its path with one lookup per step, e.g.:
+  fields = FlowFields(Grid(maze.map))
+  path = fields[goal].path(start) # same as astar_search(problem).solution()"""
+
+# ______________________________________________________________________________
+
+def next_steps(grid, dist):
+    """Array with, for each cell, the neighbour that's one move closer to the source of the
+    distance field dist (-1 for the source, walls and unreachable cells). Computed for all
+    cells at once, choosing the first such neighbour in grid.offsets order (as descend does)."""
+    steps = np.full(grid.size, -1, dtype=np.int32)
+    cells = np.flatnonzero(dist > 0) # (never on the border, so their neighbours are in the array)
+    d = dist[cells] - 1
+    for offset in grid.offsets:
+        neighbours = cells + offset
+        found = (steps[cells] == -1) & (dist[neighbours] == d)
+        steps[cells[found]] = neighbours[found]
+    return steps
+
+class FlowField:
+
+    """Distance to goal and next step towards it from every cell of a Grid,
+    valid while the grid's version doesn't change."""
+
+    """
+    Parameters
+      grid : Grid
+        map the robots move in
+      goal : (int, int)
+        goal position at the map
+    """
+    def __init__(self, grid, goal):
+        self.grid = grid
+        self.goal = grid.cell(goal)
+        self.version = grid.version
+        self.dist = distance_field(grid, self.goal)
+        self.steps = next_steps(grid, self.dist)
+        self.__dist, self.__steps = memoryview(self.dist), memoryview(self.steps)
+
+    def is_valid(self):
+        return self.version == self.grid.version
+
+    def distance(self, pos):
+        """Number of moves from pos to the goal (None if it can't be reached)."""
+        d = self.__dist[self.grid.cell(pos)]
+        return d if d >= 0 else None
+
+    def next_step(self, pos):
+        """Position to move to from pos (None at the goal, or if it can't be reached)."""
+        cell = self.__steps[self.grid.cell(pos)]
+        return self.grid.pos(cell) if cell >= 0 else None
+
+    def cells(self, start):
+        """Cells of the path from start to the goal (None if it can't be reached)."""
+        cell, steps = self.grid.cell(start), self.__steps
+        if self.__dist[cell] < 0:
+            return None
+        cells = [cell]
+        while cell != self.goal:
+            cell = steps[cell]
+            cells.append(cell)
+        return cells
+
+    def path(self, start):
+        """Sequence of actions (i.e. positions) from start to the goal, like node.solution(),
+        or None if the goal can't be reached."""
+        cells = self.cells(start)
+        return None if cells is None else self.grid.positions(cells[1:])
+
+class FlowFields:
+
+    """FlowField of each goal of a Grid, computed on first use and kept for the next ones
+    (up to maxsize goals, evicting the least recently used). Fields computed before the
+    grid changed (see Grid.version) are recomputed."""
+
+    def __init__(self, grid, maxsize=16):
+        self.grid = grid
+        self.maxsize = maxsize
+        self.fields = OrderedDict() # goal cell -> FlowField
+
+    def __getitem__(self, goal):
+        cell = self.grid.cell(goal)
+        field = self.fields.get(cell)
+        if field is None or not field.is_valid():
+            field = FlowField(self.grid, goal)
+            self.fields[cell] = field
+            if len(self.fields) > self.maxsize:
+                self.fields.popitem(last=False)
+        self.fields.move_to_end(cell)
+        return field
+
+    def clear(self):
+        self.fields.clear()
+
+# ______________________________________________________________________________
+
+def flow_field_search(problem, fields=None):
+    """Follow problem.goal's flow field from problem.initial, returning (node, reached) like
+    astar_search_for_vis (where reached is the path, as no search is run if the field is cached)."""
+    fields = fields or FlowFields(Grid.from_problem(problem))
+    grid = fields.grid
+    cells = fields[problem.goal].cells(problem.initial)
+    if cells is None:
+        return (failure, [])
+    return (grid.path_of(cells), grid.positions(cells))
@@ -0,0 +1,233 @@
+from pathfinding_robot_maps import WALL
+from pathfinding_robot_searches import failure
+from search import Node
+
+from collections import deque
+from heapq import heappush, heappop
+
+import numpy as np
+
+"""Search engine that runs directly on a NumPy grid, using flat integer cell ids
+and int32 parent / g-score arrays instead of chains of Node objects"""
+
+# ______________________________________________________________________________
+
+class Grid:
+
+    """A map stored as an int8 matrix padded with a border of walls, so that
+    every neighbour of a (non-border) cell is inside the array and no bounds
+    checks are needed. Cells are referred to by their flat (row-major) index
+    in the padded matrix, which keeps the same ordering as (i, j) tuples."""
+
+    """
+    Parameters
+      map : [[int]] or np.ndarray
+        matrix representing the labyrinth's map (see PathfindingRobotProblem)
+      diagonal_moves : bool
+        if True, each cell has 8 neighbours instead of 4
+    """
+    def __init__(self, map, diagonal_moves=False):
+        map = np.asarray(map, dtype=np.int8)
+        self.height, self.width = map.shape
+        self.cells = np.full((self.height + 2, self.width + 2), WALL, dtype=np.int8)
+        self.cells[1:-1, 1:-1] = map
+        self.stride = self.width + 2 # distance between vertically adjacent cell ids
+        self.size = self.cells.size
+
+        self.diagonal_moves = diagonal_moves
+        if diagonal_moves:
+            self.directions = [(-1, -1), (-1,  0), (-1,  1),
+                               ( 0, -1),           ( 0,  1),
+                               ( 1, -1), ( 1,  0), ( 1,  1)]
+        else:
+            self.directions = [          (-1,  0),
+                               ( 0, -1),           ( 0,  1),
+                                         ( 1,  0),         ]
+        self.offsets = [di * self.stride + dj for (di, dj) in self.directions]
+
+        self.version = 0 # incremented whenever the cells change, so cached data can be invalidated
+        self.update()
+
+    @classmethod
+    def from_problem(cls, problem):
+        return cls(problem.map, problem.diagonal_moves)
+
+    def update(self):
+        """Recompute the free cells flags, should be called after self.cells is changed."""
+        self.free = bytearray((self.cells != WALL).tobytes()) # 1 if the cell isn't a wall
+        self.version += 1
+
+    def set_cell(self, pos, value):
+        """Change the value of the (i, j) position at the map (keeping the free cells flags updated)."""
+        cell = self.cell(pos)
+        self.cells.flat[cell] = value
+        self.free[cell] = value != WALL
+        self.version += 1
+
+    def cell(self, pos):
+        """Flat id of the (i, j) position at the map."""
+        i, j = pos
+        return (i + 1) * self.stride + (j + 1)
+
+    def pos(self, cell):
+        """(i, j) position at the map of a flat cell id."""
+        i, j = divmod(cell, self.stride)
+        return (i - 1, j - 1)
+
+    def positions(self, cells):
+        """List of (i, j) positions of a sequence of cell ids, converted in one pass."""
+        i, j = np.divmod(np.asarray(cells, dtype=np.int64), self.stride)
+        return list(zip((i - 1).tolist(), (j - 1).tolist()))
+
+    def path_to(self, parent, cell, g=None):
+        """Rebuild the Node chain that reaches cell, following the parent array.
+        Only the nodes on the path are created (with path_cost taken from g, if given)."""
+        cells = []
+        while cell != -1:
+            cells.append(cell)
+            cell = parent[cell]
+        cells.reverse()
+        return self.path_of(cells, g)
+
+    def path_of(self, cells, g=None):
+        """Build the Node chain that goes through the sequence of (adjacent) cells,
+        returning its last node. The path_cost of each node is its depth, or g[cell] if g is given."""
+        node = None
+        for depth, (cell, pos) in enumerate(zip(cells, self.positions(cells))):
+            path_cost = depth if g is None else g[cell]
+            node = Node(pos, node, None if node is None else pos, path_cost)
+        return node
+
+# ______________________________________________________________________________
+# Search algorithms (all of them return (node, reached), like the *_for_vis ones)
+
+def grid_breadth_first_search(problem, grid=None):
+    grid = grid or Grid.from_problem(problem)
+    start, goal = grid.cell(problem.initial), grid.cell(problem.goal)
+    free, offsets = grid.free, grid.offsets
+
+    parent = np.full(grid.size, -1, dtype=np.int32)
+    par = memoryview(parent) # fast scalar access from python
+    seen = bytearray(grid.size) # explored or in the frontier
+    seen[start] = 1
+    reached = [start]
+    if start == goal:
+        return (grid.path_to(par, start), grid.positions(reached))
+    frontier = deque([start])
+    while frontier:
+        cell = frontier.popleft()
+        reached.append(cell)
+        for offset in offsets:
+            child = cell + offset
+            if free[child] and not seen[child]:
+                seen[child] = 1
+                par[child] = cell
+                if child == goal:
+                    return (grid.path_to(par, child), grid.positions(reached))
+                frontier.append(child)
+    return (failure, grid.positions(reached))
+
+def grid_best_first_search(problem, grid=None, h_weight=1):
+    """Dijkstra (h_weight=0) or A* (h_weight=1) with unit move costs, using
+    manhattan distance as heuristic (or chebyshev's, if diagonal moves are allowed)."""
+    grid = grid or Grid.from_problem(problem)
+    start, goal = grid.cell(problem.initial), grid.cell(problem.goal)
+    free, offsets, stride = grid.free, grid.offsets, grid.stride
+    goal_i, goal_j = divmod(goal, stride)
+    diagonal_moves = grid.diagonal_moves
+
+    parent = np.full(grid.size, -1, dtype=np.int32)
+    g = np.full(grid.size, np.iinfo(np.int32).max, dtype=np.int32)
+    par, gs = memoryview(parent), memoryview(g)
+    closed = bytearray(grid.size)
+    reached = []
+
+    gs[start] = 0
+    frontier = [(0, start)] # (f, cell), ties are broken by cell id, i.e. by (i, j)
+    while frontier:
+        _, cell = heappop(frontier)
+        if closed[cell]:
+            continue # stale entry, the cell was already expanded with a lower f
+        closed[cell] = 1
+        reached.append(cell)
+        if cell == goal:
+            return (grid.path_to(par, cell, gs), grid.positions(reached))
+        child_g = gs[cell] + 1
+        for offset in offsets:
+            child = cell + offset
+            if free[child] and not closed[child] and child_g < gs[child]:
+                gs[child] = child_g
+                par[child] = cell
+                if h_weight:
+                    i, j = divmod(child, stride)
+                    di, dj = abs(i - goal_i), abs(j - goal_j)
+                    h = max(di, dj) if diagonal_moves else di + dj
+                    heappush(frontier, (child_g + h_weight * h, child))
+                else:
+                    heappush(frontier, (child_g, child))
+    return (failure, grid.positions(reached))
+
+def grid_uniform_cost_search(problem, grid=None):
+    return grid_best_first_search(problem, grid, h_weight=0)
+
+def grid_astar_search(problem, grid=None):
+    return grid_best_first_search(problem, grid, h_weight=1)
+
+# ______________________________________________________________________________
+# Whole-map precomputations
+
+def distance_field(grid, source):
+    """BFS distance (i.e. number of moves) from source to every cell, with -1 for walls and
+    unreachable cells. Since moves are reversible, it's also the distance from every cell to source."""
+    free, offsets = grid.free, grid.offsets
+    dist = np.full(grid.size, -1, dtype=np.int32)
+    ds = memoryview(dist)
+    ds[source] = 0
+    layer, d = [source], 0
+    while layer:
+        d += 1
+        next_layer = []
+        for cell in layer:
+            for offset in offsets:
+                child = cell + offset
+                if free[child] and ds[child] == -1:
+                    ds[child] = d
+                    next_layer.append(child)
+        layer = next_layer
+    return dist
+
+def descend(grid, dist, cell):
+    """Cells of a shortest path from cell to the source of the distance field dist,
+    found by always moving to a neighbour that is one move closer (or None, if unreachable)."""
+    ds, offsets = memoryview(dist), grid.offsets
+    d = ds[cell]
+    if d == -1:
+        return None
+    path = [cell]
+    while d > 0:
+        d -= 1
+        cell = next(cell + offset for offset in offsets if ds[cell + offset] == d)
+        path.append(cell)
+    return path
+
+def component_labels(grid):
+    """Label each free cell with the id (starting at 1) of its connected component, walls get 0.
+    Two cells are connected iff their labels are equal (and non-zero)."""
+    free, offsets = grid.free, grid.offsets
+    labels = np.zeros(grid.size, dtype=np.int32)
+    ls = memoryview(labels)
+    label = 0
+    for source in np.flatnonzero(grid.cells.ravel() != WALL).tolist():
+        if ls[source]:
+            continue
+        label += 1
+        ls[source] = label
+        stack = [source]
+        while stack:
+            cell = stack.pop()
+            for offset in offsets:
+                child = cell + offset
+                if free[child] and not ls[child]:
+                    ls[child] = label
+                    stack.append(child)
+    return labels
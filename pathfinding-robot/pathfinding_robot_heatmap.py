@@ -0,0 +1,109 @@
+from pathfinding_robot_maps import WALL
+
+import shutil
+import subprocess
+
+import numpy as np
+from matplotlib import colormaps
+from PIL import Image
+
+"""Heatmaps rendered straight from NumPy arrays, without drawing a matplotlib figure.
+
+The colors are the same as save_heatmap's (matplotlib's matshow with viridis), but each
+image is built in a single vectorized pass over an expansion-order array, and animations
+are written frame by frame as GIF (with Pillow) or MP4 (with ffmpeg, if it's installed)."""
+
+# values used by save_heatmap, mapped to the colormap between VMIN and VMAX
+VMIN, VMAX = -6.0, 32.0
+EMPTY_VALUE, WALL_VALUE, PATH_VALUE, ENDPOINT_VALUE = -6.0, -2.0, 24.0, 32.0
+
+# ______________________________________________________________________________
+
+def expansion_order(shape, reached, start, goal):
+    """Array with the (0-based) order in which each cell was last reached, or -1 if it
+    wasn't, ignoring start and goal (as the heatmaps do)."""
+    order = np.full(shape, -1, dtype=np.int64)
+    if len(reached):
+        i, j = np.asarray(reached).reshape(-1, 2).T
+        keep = ~(((i == start[0]) & (j == start[1])) | ((i == goal[0]) & (j == goal[1])))
+        i, j = i[keep], j[keep]
+        np.maximum.at(order, (i, j), np.arange(len(i)))
+    return order
+
+def heatmap_values(start, goal, map, reached, seq, order=None, count=None):
+    """Values of save_heatmap's matrix: reached cells are colored by expansion order in
+    10 bands, and seq's path is drawn over them. If count is given, only the first count
+    expansions are shown (the bands still refer to the whole search)."""
+    map = np.asarray(map)
+    order = expansion_order(map.shape, reached, start, goal) if order is None else order
+    reached_amount = max(int(order.max(initial=-1)) + 1, 1)
+    values = np.where(map == WALL, WALL_VALUE, EMPTY_VALUE)
+    shown = order >= 0 if count is None else (order >= 0) & (order < count)
+    values[shown] = (10 * (order[shown] + 1) // reached_amount) * 1.6 + 4
+    if seq is not None and len(seq) > 1:
+        i, j = np.asarray(seq[:-1]).reshape(-1, 2).T # seq[-1] == goal
+        values[i, j] = PATH_VALUE
+    values[start] = values[goal] = ENDPOINT_VALUE
+    return values
+
+def heatmap_indices(values, scale=8):
+    """(height*scale, width*scale) uint8 array with the index of each pixel's color in a
+    256 color lookup table (as matplotlib's colormaps are sampled)."""
+    normalized = (np.asarray(values, dtype=np.float64) - VMIN) / (VMAX - VMIN)
+    indices = np.clip(normalized * 256, 0, 255).astype(np.uint8)
+    return np.repeat(np.repeat(indices, scale, axis=0), scale, axis=1)
+
+def palette(cmap='viridis'):
+    """(256, 3) uint8 lookup table of the colormap's colors."""
+    return colormaps[cmap].resampled(256)(np.arange(256), bytes=True)[:, :3]
+
+def heatmap_image(values, scale=8, cmap='viridis'):
+    """(height*scale, width*scale, 3) uint8 RGB image of the values."""
+    return palette(cmap)[heatmap_indices(values, scale)]
+
+def save_heatmap_image(start, goal, map, reached, seq, file_name, scale=8):
+    """Like save_heatmap, but without the plot's axes and much faster."""
+    Image.fromarray(heatmap_image(heatmap_values(start, goal, map, reached, seq), scale)).save(file_name)
+
+def heatmap_frames(start, goal, map, reached, seq, frames=60, scale=8):
+    """Color indices (as in heatmap_indices) of frames showing the search's expansions,
+    ending with the solution."""
+    map = np.asarray(map)
+    order = expansion_order(map.shape, reached, start, goal)
+    reached_amount = int(order.max(initial=-1)) + 1
+    for frame in range(1, frames + 1):
+        count = -(-frame * reached_amount // frames) # ceil
+        yield heatmap_indices(heatmap_values(start, goal, map, reached, None, order, count), scale)
+    yield heatmap_indices(heatmap_values(start, goal, map, reached, seq, order), scale)
+
+def save_heatmap_animation(start, goal, map, reached, seq, file_name, frames=60, fps=15, scale=8, cmap='viridis'):
+    """Save the frames of heatmap_frames as a .gif or .mp4 file (the last frame is held for a second)."""
+    colors = palette(cmap)
+    frames = heatmap_frames(start, goal, map, reached, seq, frames, scale)
+    if file_name.endswith('.gif'):
+        images = []
+        for indices in frames: # palette images, so Pillow doesn't need to quantize them
+            image = Image.fromarray(indices)
+            image.putpalette(colors.tobytes()) # (turns the 'L' image into a 'P' one)
+            images.append(image)
+        durations = [1000 // fps] * (len(images) - 1) + [1000]
+        images[0].save(file_name, save_all=True, append_images=images[1:], duration=durations, loop=0)
+        return
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg is needed to save animations other than .gif")
+    last = next(frames)
+    height, width = last.shape
+    process = subprocess.Popen([
+        ffmpeg, '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+        '-s', f'{width}x{height}', '-r', str(fps), '-i', '-',
+        '-pix_fmt', 'yuv420p', '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', file_name
+    ], stdin=subprocess.PIPE)
+    for indices in frames:
+        process.stdin.write(colors[last].tobytes())
+        last = indices
+    for _ in range(fps):
+        process.stdin.write(colors[last].tobytes())
+    process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed to write {file_name}")
@@ -1,18 +1,48 @@
 # Euclidean distance (diagonal moves cost sqrt(2))
 def euclidean(node, goal):
-    di, dj = [abs(k1 - k2) for (k1, k2) in zip(node.state, goal)]
-    return (di**2 + dj**2)**0.5
+    (i, j), (gi, gj) = node.state, goal
+    return ((i - gi)**2 + (j - gj)**2)**0.5
 
 # Manhattan distance (diagonal moves cost 2)
 def manhattan(node, goal):
-    di, dj = [abs(k1 - k2) for (k1, k2) in zip(node.state, goal)]
-    return di + dj
+    (i, j), (gi, gj) = node.state, goal
+    return abs(i - gi) + abs(j - gj)
 
 # Chebyshev distance (diagonal moves cost 1)
 def diagonal(node, goal):
-    di, dj = [abs(k1 - k2) for (k1, k2) in zip(node.state, goal)]
-    return max(di, dj) # chebyshev distance
+    (i, j), (gi, gj) = node.state, goal
+    return max(abs(i - gi), abs(j - gj)) # chebyshev distance
 
 # Path cost
 def g(node, goal):
     return node.path_cost
+
+# ______________________________________________________________________________
+# Heuristic tables, computed for the whole map at once and read by cell index
+
+def heuristic_table(height, width, goal, distance=manhattan):
+    """height x width array with the given distance (euclidean, manhattan or diagonal)
+    from every cell of the map to goal."""
+    import numpy as np # (imported here, as the distances above are used without it)
+    i, j = np.ogrid[:height, :width]
+    di, dj = np.abs(i - goal[0]), np.abs(j - goal[1])
+    if distance is euclidean:
+        return np.sqrt(di**2 + dj**2)
+    elif distance is manhattan:
+        return (di + dj).astype(np.float64)
+    elif distance is diagonal:
+        return np.maximum(di, dj).astype(np.float64)
+    else:
+        raise ValueError("distance must be either euclidean, manhattan or diagonal.")
+
+def table_heuristic(problem, distance=None):
+    """Heuristic h(node) for problem (a PathfindingRobotProblem) that looks up a precomputed
+    heuristic_table, instead of computing the distance on each call. By default, uses the
+    same distance as problem.h (diagonal if diagonal moves are allowed, else manhattan)."""
+    distance = distance or (diagonal if problem.diagonal_moves else manhattan)
+    width = problem.width
+    lookup = memoryview(heuristic_table(problem.height, width, problem.goal, distance).ravel())
+    def h(node):
+        i, j = node.state
+        return lookup[i * width + j]
+    return h
@@ -0,0 +1,201 @@
+from pathfinding_robot_grid import Grid
+from pathfinding_robot_searches import failure, astar_search_for_vis
+from search import Problem
+
+from collections import defaultdict, deque
+
+"""Hierarchical pathfinding (HPA*, Botea et al., 2004).
+
+The map is split into square clusters, and the cells where the robot can cross from
+one cluster to the next become entrance nodes of an abstract graph, whose edges are
+the shortest paths inside each cluster (precomputed once per map). A query connects
+its start and goal to the entrances of their clusters, runs A* on the (small) abstract
+graph and then refines it by concatenating the stored paths, so its cost grows with
+the path length instead of with the map area. Paths are near-optimal, not optimal."""
+
+# ______________________________________________________________________________
+
+class AbstractProblem(Problem):
+
+    """The problem of finding a path in the abstract graph of a HierarchicalPlanner,
+    where states are the (flat) cell ids of the entrance nodes."""
+
+    """
+    Parameters
+      planner : HierarchicalPlanner
+        planner with the precomputed abstract graph
+      initial, goal : int
+        cell ids of the query's start and goal
+      extra_edges : {int: {int: (int, [int])}}
+        temporary edges connecting initial and goal to the abstract graph
+    """
+    def __init__(self, planner, initial, goal, extra_edges):
+        Problem.__init__(self, initial, goal)
+        self.planner = planner
+        self.extra_edges = extra_edges
+        self.goal_i, self.goal_j = divmod(goal, planner.grid.stride)
+
+    def edge(self, A, B):
+        """(cost, cells) of the edge from A to B."""
+        if B in self.extra_edges.get(A, ()):
+            return self.extra_edges[A][B]
+        return self.planner.edges[A][B]
+
+    def actions(self, state):
+        return list(self.planner.edges.get(state, ())) + list(self.extra_edges.get(state, ()))
+
+    def result(self, state, action):
+        return action
+
+    def path_cost(self, cost_so_far, A, action, B):
+        return cost_so_far + self.edge(A, B)[0]
+
+    def h(self, node):
+        i, j = divmod(node.state, self.planner.grid.stride)
+        di, dj = abs(i - self.goal_i), abs(j - self.goal_j)
+        return max(di, dj) if self.planner.grid.diagonal_moves else di + dj
+
+# ______________________________________________________________________________
+
+class HierarchicalPlanner:
+
+    """Precomputed abstract graph of a map, used to answer many queries on it."""
+
+    """
+    Parameters
+      map : [[int]] or np.ndarray
+        matrix representing the labyrinth's map (see PathfindingRobotProblem)
+      cluster_size : int
+        side of the (square) clusters the map is split into
+      diagonal_moves : bool
+        if True, the robot can also move diagonally (with unit cost)
+    """
+    def __init__(self, map, cluster_size=10, diagonal_moves=False):
+        self.grid = Grid(map, diagonal_moves)
+        self.cluster_size = cluster_size
+        self.edges = defaultdict(dict) # cell -> {neighbour cell: (cost, [cells from cell to neighbour])}
+        self.entrances = defaultdict(set) # cluster -> entrance cells in it
+        self.__build_entrances()
+        for cluster, cells in self.entrances.items():
+            for cell in cells:
+                for target, path in self.local_paths(cell, cells).items():
+                    self.edges[cell][target] = (len(path) - 1, path)
+
+    @classmethod
+    def from_problem(cls, problem, cluster_size=10):
+        return cls(problem.map, cluster_size, problem.diagonal_moves)
+
+    def cluster(self, cell):
+        i, j = self.grid.pos(cell)
+        return (i // self.cluster_size, j // self.cluster_size)
+
+    def __add_transition(self, a, b):
+        self.entrances[self.cluster(a)].add(a)
+        self.entrances[self.cluster(b)].add(b)
+        self.edges[a][b] = (1, [a, b])
+        self.edges[b][a] = (1, [b, a])
+
+    """
+    Parameters
+      pairs : [(int, int)]
+        (a, b) cells facing each other along a whole border line, where a and b are in different clusters
+    """
+    def __add_border(self, pairs):
+        free, c = self.grid.free, self.cluster_size
+        run = [] # consecutive free pairs in the same border segment
+        for k, (a, b) in enumerate(pairs + [(None, None)]):
+            if a is not None and k % c != 0 and free[a] and free[b]:
+                run.append((a, b))
+                continue
+            if len(run) >= 6:
+                self.__add_transition(*run[0])
+                self.__add_transition(*run[-1])
+            elif run:
+                self.__add_transition(*run[len(run) // 2])
+            run = [(a, b)] if a is not None and free[a] and free[b] else []
+
+        if self.grid.diagonal_moves:
+            # diagonal crossings are only needed when no orthogonal one connects the same cells
+            for (a, b), (a2, b2) in zip(pairs, pairs[1:]):
+                if free[a] and free[b2] and not free[b] and not free[a2]:
+                    self.__add_transition(a, b2)
+                if free[a2] and free[b] and not free[b2] and not free[a]:
+                    self.__add_transition(a2, b)
+
+    def __build_entrances(self):
+        grid, c = self.grid, self.cluster_size
+        cell = grid.cell
+        for j in range(c - 1, grid.width - 1, c): # vertical border lines
+            self.__add_border([(cell((i, j)), cell((i, j + 1))) for i in range(grid.height)])
+        for i in range(c - 1, grid.height - 1, c): # horizontal border lines
+            self.__add_border([(cell((i, j)), cell((i + 1, j))) for j in range(grid.width)])
+
+    def local_paths(self, source, targets):
+        """Shortest paths (as lists of cells) from source to each of the targets reachable
+        without leaving source's cluster (BFS restricted to it)."""
+        grid, c = self.grid, self.cluster_size
+        free, offsets, stride = grid.free, grid.offsets, grid.stride
+        ci, cj = self.cluster(source)
+        i0, i1 = ci * c + 1, (ci + 1) * c + 1 # padded row range of the cluster
+        j0, j1 = cj * c + 1, (cj + 1) * c + 1
+        parent = {source: None}
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            for offset in offsets:
+                child = cell + offset
+                if free[child] and child not in parent:
+                    i, j = divmod(child, stride)
+                    if i0 <= i < i1 and j0 <= j < j1:
+                        parent[child] = cell
+                        frontier.append(child)
+        paths = {}
+        for target in targets:
+            if target != source and target in parent:
+                path, cell = [], target
+                while cell is not None:
+                    path.append(cell)
+                    cell = parent[cell]
+                path.reverse()
+                paths[target] = path
+        return paths
+
+    def plan(self, start, goal):
+        """Return (node, reached) for a path from start to goal, where reached
+        are the positions of the abstract nodes expanded by A*."""
+        grid = self.grid
+        s, g = grid.cell(start), grid.cell(goal)
+        if not (grid.free[s] and grid.free[g]):
+            return (failure, [])
+        if s == g:
+            return (grid.path_of([s]), [start])
+
+        extra_edges = defaultdict(dict) # temporarily connect s and g to their clusters' entrances
+        s_targets = set(self.entrances.get(self.cluster(s), ()))
+        if self.cluster(s) == self.cluster(g):
+            s_targets.add(g) # the path might not need to leave the cluster
+        if s not in self.edges:
+            for target, path in self.local_paths(s, s_targets).items():
+                extra_edges[s][target] = (len(path) - 1, path)
+        if g not in self.edges:
+            for target, path in self.local_paths(g, self.entrances.get(self.cluster(g), ())).items():
+                extra_edges[target][g] = (len(path) - 1, path[::-1])
+
+        problem = AbstractProblem(self, s, g, extra_edges)
+        node, reached = astar_search_for_vis(problem)
+        reached = grid.positions(reached)
+        if node is failure:
+            return (failure, reached)
+        abstract_path = [n.state for n in node.path()]
+        cells = [s]
+        for A, B in zip(abstract_path, abstract_path[1:]):
+            cells.extend(problem.edge(A, B)[1][1:])
+        return (grid.path_of(cells), reached)
+
+# ______________________________________________________________________________
+
+def hierarchical_search(problem, planner=None, cluster_size=10):
+    """HPA* search, returning (node, reached) like astar_search_for_vis.
+    Pass a HierarchicalPlanner to reuse its precomputed abstract graph across queries."""
+    planner = planner or HierarchicalPlanner.from_problem(problem, cluster_size)
+    return planner.plan(problem.initial, problem.goal)
@@ -0,0 +1,234 @@
+from pathfinding_robot_grid import Grid
+from pathfinding_robot_searches import failure
+
+from heapq import heappush, heappop
+
+import numpy as np
+
+"""Jump Point Search (Harabor & Grastien, 2011) for uniform-cost grids.
+
+Instead of pushing every neighbour, JPS "jumps" in straight lines from each expanded
+cell and only pushes the cells where the path may have to turn (jump points), so the
+many symmetric paths of open areas are never generated. With unit costs it finds the
+same optimal path lengths as A*, while expanding far fewer nodes. The jumps aren't
+scanned cell by cell, but looked up in a JumpTable precomputed for the whole grid (in
+a few vectorized passes), which is reusable by every search on the same map, e.g.:
+  table = JumpTable(grid)
+  node, reached = jump_point_search(problem, grid, table)
+As in PathfindingRobotProblem, diagonal moves are allowed to cut corners."""
+
+# ______________________________________________________________________________
+
+def sign(x):
+    return (x > 0) - (x < 0)
+
+def next_stops(stop, step):
+    """Array with, for each cell, the first cell at which stop is set moving by step from it
+    (excluding the cell itself), or 0 if there's none (cell 0 is a wall). Computed for all the
+    cells at once: with the flat array reshaped to rows of length |step|, each column holds the
+    cells of one line, so a cumulative min (or max) along the columns finds the next stop."""
+    n, size = len(stop), abs(step)
+    rows = -(-n // size)
+    marks = np.full(rows * size, n if step > 0 else -1, dtype=np.int32)
+    marks[:n] = np.where(stop, np.arange(n, dtype=np.int32), marks[0])
+    if step > 0: # (reversed, so the cumulative min runs over contiguous rows)
+        first = np.minimum.accumulate(marks[::-1].reshape(rows, size), axis=0).ravel()[::-1][:n] # first stop at or after each cell
+        stops = np.empty(n, dtype=np.int32)
+        stops[:n - step] = first[step:]
+        stops[n - step:] = 0
+    else:
+        first = np.maximum.accumulate(marks.reshape(rows, size), axis=0).ravel()[:n] # first stop at or before each cell
+        stops = np.empty(n, dtype=np.int32)
+        stops[size:] = first[:n - size]
+        stops[:size] = 0
+    stops[(stops < 0) | (stops >= n)] = 0 # (only for cells at the border)
+    return stops
+
+class JumpTable:
+
+    """Jumps of every cell of a Grid, precomputed as in JPS+ (Harabor & Grastien, 2012):
+    for each direction, the first cell from each cell at which a jump stops, whatever the
+    goal is, i.e. a wall or a jump point (with a forced neighbour, or from which a straight
+    jump finds one). A jump is then a lookup, plus checking whether it passes by the goal
+    (or, for the jumps that also follow straight lines, by the goal's row or column) first."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        self.version = grid.version
+        stride = grid.stride
+        free = np.frombuffer(bytes(grid.free), dtype=np.uint8).astype(bool)
+        def free_at(offset): # free flag of the cell at offset from each cell
+            shifted = np.zeros_like(free)
+            if offset >= 0:
+                shifted[:len(free) - offset] = free[offset:]
+            else:
+                shifted[-offset:] = free[:offset]
+            return shifted
+
+        stops = {}
+        for dj in (1, -1):
+            if grid.diagonal_moves: # a wall beside us, with a free cell diagonally ahead
+                forced = (free_at(dj - stride) & ~free_at(-stride)) | (free_at(dj + stride) & ~free_at(stride))
+            else: # a free cell beside us that was blocked beside the previous one
+                forced = (free_at(-stride) & ~free_at(-stride - dj)) | (free_at(stride) & ~free_at(stride - dj))
+            stops[(0, dj)] = next_stops(~free | forced, dj)
+        reaches = {d: free[stops[d]] for d in stops} # if a straight jump from each cell finds a jump point
+        for di in (1, -1):
+            row = di * stride
+            if grid.diagonal_moves:
+                forced = (free_at(row + 1) & ~free_at(1)) | (free_at(row - 1) & ~free_at(-1))
+            else: # when moving vertically in a 4-connected grid, horizontal jump points also stop us
+                forced = (free_at(1) & ~free_at(1 - row)) | (free_at(-1) & ~free_at(-1 - row))
+                forced |= reaches[(0, 1)] | reaches[(0, -1)]
+            stops[(di, 0)] = next_stops(~free | forced, row)
+            reaches[(di, 0)] = free[stops[(di, 0)]]
+        if grid.diagonal_moves:
+            for di in (1, -1):
+                for dj in (1, -1):
+                    row = di * stride
+                    forced = (free_at(row - dj) & ~free_at(-dj)) | (free_at(dj - row) & ~free_at(-row))
+                    forced |= reaches[(0, dj)] | reaches[(di, 0)]
+                    stops[(di, dj)] = next_stops(~free | forced, row + dj)
+        self.stops = {d: memoryview(stops[d]) for d in stops} # direction -> first stop from each cell
+
+    def is_valid(self):
+        return self.version == self.grid.version
+
+    def jumper(self, goal):
+        """Function jump(cell, di, dj) that moves from cell in the (di, dj) direction until
+        a jump point is found (returning it) or a wall is hit (returning -1), for this goal."""
+        grid, stops = self.grid, self.stops
+        free, stride, diagonal_moves = grid.free, grid.stride, grid.diagonal_moves
+        goal_i, goal_j = divmod(goal, stride)
+        row = grid.free[goal_i * stride : (goal_i + 1) * stride] # free cells around the goal (bounded by the border walls)
+        row_first, row_last = goal_i * stride + row.rfind(0, 0, goal_j) + 1, goal_i * stride + row.find(0, goal_j) - 1
+        column = grid.free[goal_j::stride]
+        column_first, column_last = (column.rfind(0, 0, goal_i) + 1) * stride + goal_j, (column.find(0, goal_i) - 1) * stride + goal_j
+
+        def jump(cell, di, dj):
+            stop = stops[(di, dj)][cell]
+            if di == 0:
+                if (cell < goal <= stop) if dj > 0 else (stop <= goal < cell):
+                    return goal
+            elif dj == 0:
+                if diagonal_moves:
+                    if (goal - cell) % stride == 0 and ((cell < goal <= stop) if di > 0 else (stop <= goal < cell)):
+                        return goal
+                else: # the cell on the goal's row stops us if a horizontal jump from it gets to the goal
+                    target = goal_i * stride + cell % stride
+                    if row_first <= target <= row_last and ((cell < target <= stop) if di > 0 else (stop <= target < cell)):
+                        return target
+            else: # the cells on the goal's row or column stop us if a straight jump from them gets to the goal
+                step = di * stride + dj
+                i, j = divmod(cell, stride)
+                steps = (stop - cell) // step
+                t = (goal_i - i) * di
+                if 0 < t < steps and row_first <= cell + t * step <= row_last and (goal_j - j - t * dj) * dj >= 0:
+                    steps = t
+                t = (goal_j - j) * dj
+                if 0 < t < steps and column_first <= cell + t * step <= column_last and (goal_i - i - t * di) * di >= 0:
+                    steps = t
+                return cell + steps * step if free[cell + steps * step] else -1
+            return stop if free[stop] else -1
+
+        return jump
+
+def pruned_directions(grid, cell, di, dj):
+    """Directions worth following from cell when it was reached moving in (di, dj)."""
+    free, stride = grid.free, grid.stride
+    if not grid.diagonal_moves:
+        if di == 0:
+            return [(-1, 0), (1, 0), (0, dj)]
+        else:
+            return [(0, -1), (0, 1), (di, 0)]
+    row = di * stride
+    if di and dj:
+        directions = [(di, 0), (0, dj), (di, dj)]
+        if not free[cell - dj]:
+            directions.append((di, -dj)) # forced neighbour
+        if not free[cell - row]:
+            directions.append((-di, dj)) # forced neighbour
+    elif di == 0:
+        directions = [(0, dj)]
+        if not free[cell - stride]:
+            directions.append((-1, dj)) # forced neighbour
+        if not free[cell + stride]:
+            directions.append((1, dj)) # forced neighbour
+    else:
+        directions = [(di, 0)]
+        if not free[cell - 1]:
+            directions.append((di, -1)) # forced neighbour
+        if not free[cell + 1]:
+            directions.append((di, 1)) # forced neighbour
+    return directions
+
+def interpolate(grid, cells):
+    """Fill in the cells between each pair of consecutive jump points (which are always
+    in a straight or diagonal line from one another)."""
+    stride = grid.stride
+    path = [cells[0]]
+    for cell in cells[1:]:
+        (i0, j0), (i1, j1) = divmod(path[-1], stride), divmod(cell, stride)
+        step = sign(i1 - i0) * stride + sign(j1 - j0)
+        while path[-1] != cell:
+            path.append(path[-1] + step)
+    return path
+
+# ______________________________________________________________________________
+
+def jump_point_search(problem, grid=None, table=None):
+    """A* over the jump points, returning (node, reached) like astar_search_for_vis,
+    where reached lists the expanded jump points and node ends the full cell-by-cell path.
+    A JumpTable of the grid can be given, to reuse it across searches on the same map."""
+    grid = grid or (table.grid if table is not None else Grid.from_problem(problem))
+    if table is None or table.grid is not grid or not table.is_valid():
+        table = JumpTable(grid)
+    start, goal = grid.cell(problem.initial), grid.cell(problem.goal)
+    jump = table.jumper(goal)
+    stride, diagonal_moves = grid.stride, grid.diagonal_moves
+    goal_i, goal_j = divmod(goal, stride)
+
+    def h(cell):
+        i, j = divmod(cell, stride)
+        di, dj = abs(i - goal_i), abs(j - goal_j)
+        return max(di, dj) if diagonal_moves else di + dj
+
+    parent = np.full(grid.size, -1, dtype=np.int32)
+    g = np.full(grid.size, np.iinfo(np.int32).max, dtype=np.int32)
+    par, gs = memoryview(parent), memoryview(g) # fast scalar access from python
+    closed = bytearray(grid.size)
+    reached = []
+
+    gs[start] = 0
+    frontier = [(h(start), start)]
+    while frontier:
+        _, cell = heappop(frontier)
+        if closed[cell]:
+            continue
+        closed[cell] = 1
+        reached.append(cell)
+        if cell == goal:
+            jump_points = []
+            while cell != -1:
+                jump_points.append(cell)
+                cell = par[cell]
+            jump_points.reverse()
+            return (grid.path_of(interpolate(grid, jump_points)), grid.positions(reached))
+
+        if par[cell] == -1:
+            directions = grid.directions
+        else:
+            i, j = divmod(cell, stride)
+            pi, pj = divmod(par[cell], stride)
+            directions = pruned_directions(grid, cell, sign(i - pi), sign(j - pj))
+        cell_g = gs[cell]
+        for (di, dj) in directions:
+            child = jump(cell, di, dj)
+            if child == -1 or closed[child]:
+                continue
+            child_g = cell_g + (child - cell) // (di * stride + dj) # (each straight or diagonal step costs 1)
+            if child_g < gs[child]:
+                gs[child] = child_g
+                par[child] = cell
+                heappush(frontier, (child_g + h(child), child))
+    return (failure, grid.positions(reached))
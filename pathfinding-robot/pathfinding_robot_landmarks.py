@@ -0,0 +1,106 @@
+from pathfinding_robot_grid import Grid, distance_field
+from pathfinding_robot_maps import WALL
+
+import hashlib
+import os
+
+import numpy as np
+
+"""Precomputed heuristic tables: landmark (ALT) lower bounds and exact goal distance fields.
+
+Tables are BFS distance fields over the whole map, saved as .npy files named after a
+digest of the map's walls (so they're reused by every run, process, or (start, goal)
+pair on the same maze) and memory-mapped when loaded. The heuristics they give are
+admissible and consistent, and are evaluated with a single lookup by cell id, e.g.:
+  tables = HeuristicTables(problem.map, problem.diagonal_moves)
+  astar_search(problem, h=tables.alt_heuristic(problem.goal))"""
+
+infinity = float('inf')
+
+# default directory of the saved tables (next to this module, whatever the working directory is)
+TABLES_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'heuristic_tables')
+
+# ______________________________________________________________________________
+
+class HeuristicTables:
+
+    """
+    Parameters
+      map : [[int]] or np.ndarray
+        matrix representing the labyrinth's map (see PathfindingRobotProblem)
+      diagonal_moves : bool
+        if True, the robot can also move diagonally (with unit cost)
+      directory : str
+        where the tables are saved (None keeps them only in memory)
+    """
+    def __init__(self, map, diagonal_moves=False, directory=TABLES_DIRECTORY):
+        self.grid = Grid(map, diagonal_moves)
+        self.directory = directory
+        digest = hashlib.sha1(f'{self.grid.cells.shape} {diagonal_moves}'.encode())
+        digest.update(np.packbits(self.grid.cells == WALL).tobytes()) # START and GOAL cells count as empty
+        self.digest = digest.hexdigest()[:16]
+
+    @classmethod
+    def from_problem(cls, problem, directory=TABLES_DIRECTORY):
+        return cls(problem.map, problem.diagonal_moves, directory)
+
+    def __table(self, name, compute):
+        """Load the table (memory-mapped) if it was already saved, else compute and save it."""
+        if self.directory is None:
+            return compute()
+        path = os.path.join(self.directory, f'{self.digest}-{name}.npy')
+        if not os.path.exists(path):
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, compute())
+            os.replace(tmp_path, path) # atomic, so concurrent processes never read a partial table
+        return np.load(path, mmap_mode='r')
+
+    def landmark_distances(self, count=8):
+        """(count, grid.size) array with the distance from each landmark to every cell (-1 if unreachable).
+        Landmarks are chosen by farthest-point selection, so they end up spread at the map's borders."""
+        def compute():
+            grid = self.grid
+            free_cells = np.flatnonzero(grid.cells.ravel() != WALL)
+            if len(free_cells) == 0:
+                return np.full((0, grid.size), -1, dtype=np.int32)
+            dist = distance_field(grid, int(free_cells[0]))
+            fields = []
+            closest = np.full(grid.size, np.iinfo(np.int32).max, dtype=np.int64) # distance to the nearest landmark
+            for _ in range(count):
+                landmark = int(np.argmax(np.where(dist >= 0, np.minimum(closest, dist), -1)))
+                dist = distance_field(grid, landmark)
+                fields.append(dist)
+                closest = np.minimum(closest, np.where(dist >= 0, dist, closest))
+            return np.stack(fields)
+        return self.__table(f'landmarks{count}', compute)
+
+    def goal_distances(self, goal):
+        """Exact distance from every cell to goal (-1 if unreachable)."""
+        cell = self.grid.cell(goal)
+        return self.__table(f'goal{cell}', lambda: distance_field(self.grid, cell))
+
+    def __heuristic(self, table):
+        """h(node) that looks up node's cell in the int32 table (where -1 means infinity)."""
+        stride = self.grid.stride
+        lookup = memoryview(np.ascontiguousarray(table, dtype=np.int32))
+        def h(node):
+            i, j = node.state
+            value = lookup[(i + 1) * stride + (j + 1)]
+            return value if value >= 0 else infinity
+        return h
+
+    def alt_heuristic(self, goal, count=8):
+        """Heuristic h(node) = max over the landmarks L of |d(L, goal) - d(L, node)|,
+        a lower bound on d(node, goal) by the triangle inequality (infinity if node can't reach goal)."""
+        distances = np.asarray(self.landmark_distances(count))
+        to_goal = distances[:, self.grid.cell(goal)][:, None]
+        reaches = (distances >= 0) & (to_goal >= 0)
+        bound = np.where(reaches, np.abs(distances - to_goal), 0).max(axis=0, initial=0).astype(np.int32)
+        bound[((distances < 0) & (to_goal >= 0)).any(axis=0)] = -1 # other component than goal's
+        return self.__heuristic(bound)
+
+    def exact_heuristic(self, goal):
+        """Heuristic h(node) = d(node, goal), so A* only expands cells on shortest paths."""
+        return self.__heuristic(self.goal_distances(goal)) # looked up straight from the memory-mapped file
@@ -1,4 +1,7 @@
-import matplotlib.pyplot as plt
+import struct
+
+# matplotlib and numpy are imported by the functions that use them, so that importing
+# the maps (and PathfindingRobotProblem, which needs them) stays fast, e.g. in worker processes
 
 EMPTY = 0
 WALL  = 1
@@ -6,6 +9,7 @@ START = 2
 GOAL  = 3
 
 def visualize_solution(start, goal, map, reached, seq, animate):
+    import matplotlib.pyplot as plt
     mmap = [row[:] for row in map]
     mmap[start[0]][start[1]] = 16
     mmap[goal[0]][goal[1]] = 16
@@ -41,6 +45,7 @@ def visualize_solution(start, goal, map, reached, seq, animate):
     plt.show()
 
 def save_heatmap(start, goal, map, reached, seq, file_name):
+    import matplotlib.pyplot as plt
     mmap = [row[:] for row in map]
     for i in range(0, len(map)):
         for j in range(0, len(map[0])):
@@ -66,6 +71,7 @@ def save_heatmap(start, goal, map, reached, seq, file_name):
     plt.savefig(file_name, bbox_inches='tight')
 
 def print_heatmap(start, goal, map, reached, seq):
+    import matplotlib.pyplot as plt
     mmap = [row[:] for row in map]
     for i in range(0, len(map)):
         for j in range(0, len(map[0])):
@@ -91,6 +97,7 @@ def print_heatmap(start, goal, map, reached, seq):
     plt.show()
 
 def visualize_heatmap(start, goal, map, reached, seq):
+    import matplotlib.pyplot as plt
     mmap = [row[:] for row in map]
     for i in range(0, len(map)):
         for j in range(0, len(map[0])):
@@ -128,6 +135,45 @@ def visualize_heatmap(start, goal, map, reached, seq):
     plt.matshow(mmap, fignum=0)
     plt.show()
 
+def watch_heatmap(start, goal, map, events, frame_pause=.01):
+    """Draw a search live from its event stream (see the *_search_events methods in
+    pathfinding_robot_searches), redrawing once per event batch instead of once per node.
+    Reached cells are colored by expansion order (relative to the expansions so far)
+    and frontier cells are shown until they're expanded."""
+    import matplotlib.pyplot as plt
+    import numpy as np
+    walls = np.array(map) == WALL
+    order = np.full(walls.shape, -1.0) # expansion order of each cell, -1 if not expanded yet
+    frontier = np.zeros(walls.shape, dtype=bool)
+    count = 0
+    mmap = np.where(walls, -2.0, -6.0)
+    mmap[start] = mmap[goal] = 32
+
+    plt.cla()
+    image = plt.matshow(mmap, fignum=0, vmin=-6, vmax=32)
+    plt.pause(.5)
+    for kind, payload in events:
+        if kind == 'solution':
+            break
+        i, j = np.array(payload).reshape(-1, 2).T
+        if kind == 'push':
+            frontier[i, j] = True
+            continue
+        frontier[i, j] = False
+        order[i, j] = np.arange(count, count + len(payload))
+        count += len(payload)
+        reached = order >= 0
+        mmap[reached] = (10 * order[reached] / count).astype(int) * 1.6 + 4
+        mmap[frontier] = 2
+        mmap[start] = mmap[goal] = 32
+        image.set_data(mmap)
+        plt.pause(frame_pause)
+
+    for i, j in payload.solution()[:-1]: # seq[-1] == goal
+        mmap[i, j] = 24
+    image.set_data(mmap)
+    plt.show()
+
 # ______________________________________________________________________________
 
 class Maze:
@@ -136,6 +182,66 @@ class Maze:
         self.goal = goal
         self.map = map
 
+def random_maze(size, wall_density=0.2, seed=0):
+    """Seeded size x size Maze, with walls on its border and inner cells that are walls
+    with probability wall_density. The start is at the bottom-left corner and the goal
+    at the top-right (as in the mazes below), and a random monotone (up/right) path
+    between them is kept free, so that the maze always has a solution."""
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    map = (rng.random((size, size)) < wall_density).astype(np.int8)
+    map[[0, -1], :] = WALL
+    map[:, [0, -1]] = WALL
+    start, goal = (size - 2, 1), (1, size - 2)
+    moves_right = rng.permutation(np.repeat([False, True], size - 3))
+    map[start[0] - np.cumsum(~moves_right), start[1] + np.cumsum(moves_right)] = EMPTY
+    map[start] = START
+    map[goal] = GOAL
+    return Maze(start, goal, map.tolist())
+
+# ______________________________________________________________________________
+# Binary maze files: a 32 byte header followed by the map's cells, one uint8 per cell (row-major)
+
+MAZE_MAGIC = b'MAZE'
+MAZE_HEADER = struct.Struct('<4sHH6I') # magic, version, unused, height, width, start (i, j), goal (i, j)
+MAZE_HEADER_SIZE = 32
+
+def save_maze(maze, file_name):
+    """Save a Maze (e.g. small_maze, or one returned by random_maze) in the binary maze format.
+    The cells at maze.start and maze.goal are saved marked as START and GOAL (and any other marked
+    cells as EMPTY), so the loaded map is ready for a PathfindingRobotProblem, even if read-only."""
+    import numpy as np
+    cells = np.array(maze.map, dtype=np.uint8) # (a copy, so maze.map isn't changed)
+    cells[(cells == START) | (cells == GOAL)] = EMPTY
+    cells[maze.start] = START
+    cells[maze.goal] = GOAL
+    height, width = cells.shape
+    header = MAZE_HEADER.pack(MAZE_MAGIC, 1, 0, height, width, *maze.start, *maze.goal)
+    with open(file_name, 'wb') as f:
+        f.write(header.ljust(MAZE_HEADER_SIZE, b'\0'))
+        f.write(cells.tobytes())
+
+"""
+Parameters
+  file_name : str
+    file written by save_maze
+  mode : str
+    np.memmap mode: 'r' (read-only) or 'c' (copy-on-write, so the map can be edited in memory)
+"""
+def load_maze(file_name, mode='r'):
+    """Maze whose map is a (height, width) np.memmap of the file, so only the header is read,
+    whatever the maze's size, and processes loading the same file share its pages."""
+    import numpy as np
+    with open(file_name, 'rb') as f:
+        header = f.read(MAZE_HEADER.size)
+    if len(header) < MAZE_HEADER.size or header[:4] != MAZE_MAGIC:
+        raise ValueError(f"{file_name} isn't a maze file.")
+    magic, version, _, height, width, si, sj, gi, gj = MAZE_HEADER.unpack(header)
+    if version != 1:
+        raise ValueError(f"{file_name} isn't a (version 1) maze file.")
+    map = np.memmap(file_name, dtype=np.uint8, mode=mode, offset=MAZE_HEADER_SIZE, shape=(height, width))
+    return Maze((si, sj), (gi, gj), map)
+
 small_maze = Maze((5,1), (1,5), [
     [1,1,1,1,1,1,1],
     [1,0,0,0,1,0,1],
@@ -0,0 +1,142 @@
+from pathfinding_robot_grid import Grid, distance_field
+from search import Problem, astar_search
+
+"""Multi-agent pathfinding by prioritized planning (Silver, 2005).
+
+Robots are planned one at a time, in priority order, each with A* in (position, time)
+space, and the cells and moves of every planned path are added to a space-time
+reservation table, that the following robots must avoid. Robots can wait in place,
+and stay at their goals once they get there.
+
+Prioritized planning is fast but incomplete: a robot may fail to find a path when the
+ones planned before it block its way (e.g. by parking on a corridor it needs)."""
+
+infinity = float('inf')
+
+# ______________________________________________________________________________
+
+class ReservationTable:
+
+    """Space-time cells (cell, t) and moves (cell, next cell, t) taken by the planned robots,
+    where a robot that finished its path keeps its goal cell from then on."""
+
+    def __init__(self):
+        self.vertices = set() # (cell, t)
+        self.edges = set() # (cell, next_cell, t), a move between t and t + 1
+        self.parked = {} # cell -> time from which a robot stays at it
+        self.last = {} # cell -> last time it's reserved (before any robot parks at it)
+        self.end = 0 # time from which every robot is parked, so reservations no longer change
+
+    def reserve(self, cells):
+        """Reserve the path of a robot, given as its cell at each time step."""
+        for t, cell in enumerate(cells):
+            self.vertices.add((cell, t))
+            self.last[cell] = max(self.last.get(cell, -1), t)
+        for t in range(len(cells) - 1):
+            self.edges.add((cells[t], cells[t + 1], t))
+        self.parked[cells[-1]] = len(cells) - 1
+        self.end = max(self.end, len(cells) - 1)
+
+    def is_free(self, cell, t):
+        return (cell, t) not in self.vertices and t < self.parked.get(cell, infinity)
+
+    def can_move(self, cell, next_cell, t):
+        """True if moving from cell to next_cell between t and t + 1 doesn't collide (or swap places) with a robot."""
+        return self.is_free(next_cell, t + 1) and (next_cell, cell, t) not in self.edges
+
+class SpaceTimeProblem(Problem):
+
+    """Path of one robot across a Grid, with states (cell, t), avoiding the reservations.
+    Each move (or wait) costs 1, and the goal is reached at cell goal once no other robot
+    will go through it later. As every time after reservations.end is the same, t stops
+    at reservations.end + 1, so the state space is finite (and the search ends if there's no path)."""
+
+    """
+    Parameters
+      grid : Grid
+        map the robots move in
+      start : int
+        robot's initial cell (at time 0)
+      goal : int
+        robot's goal cell
+      reservations : ReservationTable
+        cells and moves taken by the robots planned before this one
+    """
+    def __init__(self, grid, start, goal, reservations):
+        Problem.__init__(self, (start, 0), goal)
+        self.grid = grid
+        self.reservations = reservations
+        self.last_time = reservations.end + 1
+        self.moves = [0] + grid.offsets # waiting in place, then each direction
+        self.dist = memoryview(distance_field(grid, goal)) # exact distances (ignoring other robots), a consistent h
+
+    def actions(self, state):
+        cell, t = state
+        free, can_move = self.grid.free, self.reservations.can_move
+        return [cell + move for move in self.moves if free[cell + move] and can_move(cell, cell + move, t)]
+
+    def result(self, state, action):
+        return (action, min(state[1] + 1, self.last_time))
+
+    def goal_test(self, state):
+        cell, t = state
+        return cell == self.goal and t > self.reservations.last.get(cell, -1)
+
+    def path_cost(self, cost_so_far, A, action, B):
+        return cost_so_far + 1
+
+    def h(self, node):
+        d = self.dist[node.state[0]]
+        return d if d >= 0 else infinity
+
+# ______________________________________________________________________________
+
+"""
+Parameters
+  maze : Maze
+    map shared by the robots (start and goal of the maze itself are ignored)
+  tasks : [((int, int), (int, int))]
+    (start, goal) positions of each robot, in decreasing order of priority
+  diagonal_moves : bool
+    if True, the robots can also move diagonally (with unit cost)
+"""
+def prioritized_planning(maze, tasks, diagonal_moves=False):
+    """List with the path of each robot, as its (i, j) position at each time step
+    (robots stay at their goals after their path ends), or None for the robots
+    that couldn't be planned around the previous ones."""
+    grid = Grid(maze.map, diagonal_moves)
+    reservations = ReservationTable()
+    paths = []
+    for start, goal in tasks:
+        start, goal = grid.cell(start), grid.cell(goal)
+        problem = SpaceTimeProblem(grid, start, goal, reservations)
+        node = None
+        if reservations.is_free(start, 0) and problem.dist[start] >= 0 and goal not in reservations.parked:
+            node = astar_search(problem)
+        if node is None:
+            paths.append(None)
+            continue
+        cells = [n.state[0] for n in node.path()]
+        reservations.reserve(cells)
+        paths.append(grid.positions(cells))
+    return paths
+
+def conflicts(paths):
+    """List of (t, a, b) for each time step t at which robots a and b collide, by being at the
+    same position or by swapping positions (robots stay at their last position once done)."""
+    paths = [(a, path) for a, path in enumerate(paths) if path]
+    length = max((len(path) for _, path in paths), default=0)
+    at = lambda path, t: path[min(t, len(path) - 1)]
+    found = []
+    for t in range(length):
+        occupied = {}
+        for a, path in paths:
+            pos = at(path, t)
+            if pos in occupied:
+                found.append((t, occupied[pos], a))
+            occupied[pos] = a
+            if t + 1 < length:
+                for b, other in paths:
+                    if b > a and at(other, t) == at(path, t + 1) and at(other, t + 1) == pos and pos != at(path, t + 1):
+                        found.append((t, a, b))
+    return found
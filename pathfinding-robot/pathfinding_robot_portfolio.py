@@ -0,0 +1,98 @@
+from pathfinding_robot_searches import failure
+from pathfinding_robot_grid import grid_astar_search
+from pathfinding_robot_jps import jump_point_search
+from search import (
+    Node, astar_search, greedy_best_first_graph_search,
+    bidirectional_breadth_first_search
+)
+
+from multiprocessing import Process, Queue
+from queue import Empty
+from time import time
+
+"""Portfolio search: several strategies run at once, each in its own process, on the
+same problem, and the first solution that meets the required optimality is returned
+(and the other strategies are cancelled). Useful to get a low tail latency when it's
+not known which algorithm suits a maze best."""
+
+infinity = float('inf')
+
+# ______________________________________________________________________________
+
+def greedy_best_first_search(problem):
+    return greedy_best_first_graph_search(problem, problem.h)
+
+# name -> (search function, guaranteed bound on cost / optimal cost, for unit move costs)
+# (bidirectional_astar_search isn't included, as on grid mazes it's no faster than astar_search)
+portfolio_strategies = {
+    "astar_search" : (astar_search, 1),
+    "greedy_best_first_search" : (greedy_best_first_search, infinity),
+    "bidirectional_breadth_first_search" : (bidirectional_breadth_first_search, 1),
+    "grid_astar_search" : (grid_astar_search, 1),
+    "jump_point_search" : (jump_point_search, 1),
+}
+
+def _run_strategy(name, search, problem, results):
+    """Put (name, solution, cost) in the results queue, with solution = None and cost = infinity
+    if there's no solution, or cost = None if the search failed with an exception."""
+    try:
+        result = search(problem)
+        node = result[0] if isinstance(result, tuple) else result
+        if node is None or node is failure:
+            results.put((name, None, infinity))
+        else:
+            results.put((name, node.solution(), node.path_cost)) # (a Node chain is too deep to pickle)
+    except Exception:
+        results.put((name, None, None))
+
+"""
+Parameters
+  problem : Problem
+    problem to solve (e.g. a PathfindingRobotProblem), it must have an admissible h
+  strategies : [str]
+    names of the portfolio_strategies to run (by default A*, greedy best-first and bidirectional BFS)
+  max_suboptimality : float
+    a solution is accepted if its cost is guaranteed to be at most max_suboptimality times the optimal,
+    either by the strategy itself or by being within that factor of the h(initial) lower bound
+  timeout : float
+    seconds to wait for an accepted solution, after which the best one found (if any) is returned
+"""
+def portfolio_search(problem, strategies=None, max_suboptimality=1, timeout=None):
+    """Return (node, name of the strategy that found it), or (failure, None)."""
+    strategies = strategies or ["astar_search", "greedy_best_first_search", "bidirectional_breadth_first_search"]
+    lower_bound = problem.h(Node(problem.initial))
+    results = Queue()
+    processes = [Process(target=_run_strategy, args=(name, portfolio_strategies[name][0], problem, results),
+                         daemon=True) for name in strategies]
+    for process in processes:
+        process.start()
+
+    best, best_name, best_cost = None, None, infinity
+    deadline = None if timeout is None else time() + timeout
+    try:
+        for _ in strategies:
+            try:
+                name, solution, cost = results.get(timeout=None if deadline is None else max(0, deadline - time()))
+            except Empty:
+                break
+            if cost == infinity:
+                best = None # the strategies are complete, so the goal is unreachable
+                break
+            if solution is None:
+                continue
+            if cost < best_cost:
+                best, best_name, best_cost = solution, name, cost
+            if portfolio_strategies[name][1] <= max_suboptimality or cost <= max_suboptimality * lower_bound:
+                break
+    finally:
+        for process in processes: # cancels the strategies that are still running
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    if best is None:
+        return (failure, None)
+    node = Node(problem.initial)
+    for action in best:
+        node = node.child_node(problem, action)
+    return (node, best_name)
@@ -0,0 +1,154 @@
+from pathfinding_robot_maps import WALL, START, GOAL
+from pathfinding_robot_heuristics import manhattan, diagonal
+
+from search import Problem
+
+from random import shuffle
+import hashlib
+
+"""PathfindingRobotProblem, without the demo in pathfinding_robot.py (nor numpy and matplotlib),
+so it's quick to import and to create problems with, e.g. by worker processes."""
+
+index_by = lambda ij_tuple, m: m[ij_tuple[0]][ij_tuple[1]]
+
+free_flags = bytes(int(value != WALL) for value in range(256)) # translation table from cell values to 1 (free) or 0 (wall)
+
+# ______________________________________________________________________________
+class PathfindingRobotProblem(Problem):
+
+    """The problem of finding a path in a labyrinth defined by a grid map (i.e. an n x m matrix)."""
+
+    """
+    Parameters
+      initial : (int, int)
+        robot's initial postition at the map, i.e. (i0,j0)
+      goal : (int, int)
+        goal postition at the map, i.e. (I,J)
+      map : [[int]]
+        matrix representing the labyrinth's map, where the cell's values represent:
+          0 - empty cell
+          1 - wall
+          2 - robot's initial (start) position
+          3 - robot's target (goal) position
+        obs.: map is a list of rows: line i, row j <-> map[i][j]
+        (if it's changed after the problem is created, compile_actions should be called again)
+    """
+    def __init__(self, initial, goal, map, diagonal_moves=False, shuffle_actions_list=False):
+        assert(index_by(initial, map) == START)
+        assert(index_by(goal, map) == GOAL)
+
+        self.map    = map
+        self.height = len(map) # number of rows (m)
+        self.width  = len(map[0]) # number of columns (n)
+
+        self.initial = initial
+        self.goal = goal
+
+        self.diagonal_moves = diagonal_moves
+        self.shuffle_actions_list = shuffle_actions_list
+
+        if diagonal_moves:
+            self.directions = [(-1, -1), (-1,  0), (-1,  1),
+                               ( 0, -1),           ( 0,  1),
+                               ( 1, -1), ( 1,  0), ( 1,  1)]
+        else:
+            self.directions = [          (-1,  0),
+                               ( 0, -1),           ( 0,  1),
+                                         ( 1,  0),         ]
+        self.compile_actions()
+
+        Problem.__init__(self, self.initial, self.goal)
+
+    def compile_actions(self):
+        """Precompute a bitmask of the valid moves from each cell (bit k is set if moving in
+        self.directions[k] is valid), and the list of directions that each mask stands for,
+        so that actions only looks them up instead of validating every move."""
+        height, width, map = self.height, self.width, self.map
+        padding = bytes(width + 2)
+        rows = map.tolist() if hasattr(map, 'tolist') else map # (e.g. load_maze's np.memmap)
+        free = [padding] + [b'\0' + bytes(row).translate(free_flags) + b'\0' for row in rows] + [padding] # 1 if free, padded with walls
+        masks = bytearray()
+        for i in range(1, height + 1):
+            cell_free = int.from_bytes(free[i][1:-1], 'big') # one byte per cell, as a big int, so the ops below work on whole rows
+            row_masks = 0
+            for k, (di, dj) in enumerate(self.directions):
+                neighbour_free = int.from_bytes(free[i + di][1 + dj : 1 + dj + width], 'big')
+                row_masks |= (cell_free & neighbour_free) << k # (each byte is 0 or 1, so shifts don't carry over)
+            masks += row_masks.to_bytes(width, 'big')
+        self.__masks = bytes(masks) # row-major, i.e. cell (i, j) is at i * width + j (bytes, so problems can be pickled)
+        self.__moves = [[d for k, d in enumerate(self.directions) if mask >> k & 1]
+                        for mask in range(1 << len(self.directions))]
+        self.__bits = {d: 1 << k for k, d in enumerate(self.directions)} # direction -> its bit in the masks
+        self.__digest = None # (see moves_digest)
+
+    def moves_digest(self):
+        """Hex digest of the compiled moves, i.e. of the map's walls (START and GOAL count as empty)
+        and the move model, as they were at the last compile_actions. Computed on first use."""
+        if self.__digest is None:
+            digest = hashlib.sha1(f'{self.height} {self.width} {self.directions}'.encode())
+            digest.update(self.__masks)
+            self.__digest = digest.hexdigest()[:16]
+        return self.__digest
+
+    """
+    Parameters
+      state : (int, int)
+        robot's current postition at the map, i.e. (i,j)
+    """
+    def actions(self, state):
+        i, j = state
+        actions_list = [(i + di, j + dj) for (di, dj) in self.__moves[self.__masks[i * self.width + j]]]
+        if (self.shuffle_actions_list):
+            shuffle(actions_list) # randomizes actions' order
+        return actions_list
+
+    """
+    Parameters
+      state : (int, int)
+        robot's current postition at the map, i.e. (i,j)
+      action : (int, int)
+        (neighbouring) position the robot would move to, i.e. (i',j')
+    """
+    def result(self, state, action):
+        return action # assumed to be a valid action in the state
+
+    """
+    Parameters
+      state : (int, int)
+        robot's current postition at the map, i.e. (i,j)
+    """
+    def goal_test(self, state):
+        return state == self.goal
+
+    """
+    Parameters
+      cost_so_far : int
+        cost already paid to get to state A
+      A : (int, int)
+        robot's current postition at the map, i.e. (i,j)
+      action : (int, int)
+        neighbouring position the robot would move to, i.e. (i',j')
+      B : (int, int)
+        robot's next postition at the map, i.e. (i',j')
+    """
+    def path_cost(self, cost_so_far, A, action, B):
+        """If the move is valid (i.e. A and B are neighbors, and the action takes to B) it's cost is 1."""
+        # di, dj = [abs(k1 - k2) for (k1, k2) in zip(A, B)]
+        i, j = A
+        bit = self.__bits.get((B[0] - i, B[1] - j), 0) # (checked with the compiled masks, like in actions)
+        if action == B and 0 <= i < self.height and 0 <= j < self.width and self.__masks[i * self.width + j] & bit:
+            return cost_so_far + 1 # if di + dj <= 1 else 2**0.5 # (see TerrainProblem for sqrt(2) diagonal moves and per-cell costs)
+        else:
+            return float('inf')
+
+    """
+    Parameters
+      state : (int, int)
+        robot's current postition at the map, i.e. (i,j),
+        for which we estimate the lowest path cost to the goal using an admissible heuristic
+    """
+    def h(self, state):
+        if not self.diagonal_moves:
+            return manhattan(state, self.goal)
+        else:
+            return diagonal(state, self.goal) # (TerrainProblem uses the octile distance)
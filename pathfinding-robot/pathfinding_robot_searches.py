@@ -1,4 +1,7 @@
-from search import Node, PriorityQueue, memoize, deque
+from search import (
+    Node, PriorityQueue, IndexedPriorityQueue, IndexedQueue, memoize,
+    bidirectional_breadth_first_search, bidirectional_astar_search
+)
 
 """Methods from search.py altered to return the list of reached nodes for visualization"""
 
@@ -8,7 +11,7 @@ failure = Node('failure', path_cost=float('inf')) # Indicates an algorithm could
 # Uninformed search algorithms
 
 def depth_first_search_for_vis(problem):
-    frontier = [(Node(problem.initial))]  # Stack
+    frontier = IndexedQueue([Node(problem.initial)])  # Stack
     explored = set()
     reached = []
     while frontier:
@@ -28,7 +31,7 @@ def breadth_first_search_for_vis(problem):
     reached.append(node.state)
     if problem.goal_test(node.state):
         return (node, reached)
-    frontier = deque([node])
+    frontier = IndexedQueue([node])  # FIFO queue
     explored = set()
     while frontier:
         node = frontier.popleft()
@@ -41,6 +44,11 @@ def breadth_first_search_for_vis(problem):
                 frontier.append(child)
     return (failure, reached)
 
+def bidirectional_breadth_first_search_for_vis(problem):
+    reached = []
+    node = bidirectional_breadth_first_search(problem, reached)
+    return (node or failure, reached)
+
 def uniform_cost_search_for_vis(problem):
     return best_first_search_for_vis(problem, lambda node: node.path_cost)
 
@@ -50,7 +58,7 @@ def uniform_cost_search_for_vis(problem):
 def best_first_search_for_vis(problem, f):
     f = memoize(f, 'f')
     node = Node(problem.initial)
-    frontier = PriorityQueue('min', f)
+    frontier = IndexedPriorityQueue('min', f)
     frontier.append(node)
     explored = set()
     reached = []
@@ -72,3 +80,121 @@ def best_first_search_for_vis(problem, f):
 def astar_search_for_vis(problem, h=None):
     h = memoize(h or problem.h, 'h')
     return best_first_search_for_vis(problem, lambda n: n.path_cost + h(n))
+
+def bidirectional_astar_search_for_vis(problem, h=None, h_back=None):
+    reached = []
+    node = bidirectional_astar_search(problem, h, h_back, reached)
+    return (node or failure, reached)
+
+# ______________________________________________________________________________
+# Event streams, to watch a search while it runs instead of collecting every reached state
+
+"""The *_search_events generators yield the same searches as events (kind, payload):
+  ('push', [state])    states added to the frontier
+  ('expand', [state])  states taken from the frontier, in order
+  ('solution', node)   the last event, with node = failure if there's no solution
+States are batched, so that with batch_size = k a push and an expand event are yielded only
+every k expansions (the pushes of a batch come before its expansions), which lets large
+searches be drawn live without a redraw per node. Only the current batch is kept in memory."""
+
+def _flush(pushed, expanded):
+    if pushed:
+        yield ('push', pushed)
+    if expanded:
+        yield ('expand', expanded)
+
+def depth_first_search_events(problem, batch_size=1):
+    frontier = IndexedQueue([Node(problem.initial)])  # Stack
+    explored = set()
+    pushed, expanded = [problem.initial], []
+    while frontier:
+        node = frontier.pop()
+        expanded.append(node.state)
+        if problem.goal_test(node.state):
+            yield from _flush(pushed, expanded)
+            yield ('solution', node)
+            return
+        explored.add(node.state)
+        for child in node.expand(problem):
+            if child.state not in explored and child not in frontier:
+                frontier.append(child)
+                pushed.append(child.state)
+        if len(expanded) >= batch_size:
+            yield from _flush(pushed, expanded)
+            pushed, expanded = [], []
+    yield from _flush(pushed, expanded)
+    yield ('solution', failure)
+
+def breadth_first_search_events(problem, batch_size=1):
+    node = Node(problem.initial)
+    if problem.goal_test(node.state):
+        yield ('expand', [node.state])
+        yield ('solution', node)
+        return
+    frontier = IndexedQueue([node])  # FIFO queue
+    explored = set()
+    pushed, expanded = [node.state], [node.state]
+    while frontier:
+        node = frontier.popleft()
+        explored.add(node.state)
+        expanded.append(node.state)
+        for child in node.expand(problem):
+            if child.state not in explored and child not in frontier:
+                if problem.goal_test(child.state):
+                    yield from _flush(pushed, expanded)
+                    yield ('solution', child)
+                    return
+                frontier.append(child)
+                pushed.append(child.state)
+        if len(expanded) >= batch_size:
+            yield from _flush(pushed, expanded)
+            pushed, expanded = [], []
+    yield from _flush(pushed, expanded)
+    yield ('solution', failure)
+
+def best_first_search_events(problem, f, batch_size=1):
+    f = memoize(f, 'f')
+    node = Node(problem.initial)
+    frontier = IndexedPriorityQueue('min', f)
+    frontier.append(node)
+    explored = set()
+    pushed, expanded = [node.state], []
+    while frontier:
+        node = frontier.pop()
+        expanded.append(node.state)
+        if problem.goal_test(node.state):
+            yield from _flush(pushed, expanded)
+            yield ('solution', node)
+            return
+        explored.add(node.state)
+        for child in node.expand(problem):
+            if child.state not in explored and child not in frontier:
+                frontier.append(child)
+                pushed.append(child.state)
+            elif child in frontier:
+                if f(child) < frontier[child]:
+                    del frontier[child]
+                    frontier.append(child)
+                    pushed.append(child.state)
+        if len(expanded) >= batch_size:
+            yield from _flush(pushed, expanded)
+            pushed, expanded = [], []
+    yield from _flush(pushed, expanded)
+    yield ('solution', failure)
+
+def uniform_cost_search_events(problem, batch_size=1):
+    return best_first_search_events(problem, lambda node: node.path_cost, batch_size)
+
+def astar_search_events(problem, h=None, batch_size=1):
+    h = memoize(h or problem.h, 'h')
+    return best_first_search_events(problem, lambda n: n.path_cost + h(n), batch_size)
+
+def collect_events(events):
+    """(node, reached) from an event stream, as returned by the *_for_vis methods."""
+    reached = []
+    for kind, payload in events:
+        if kind == 'expand':
+            reached.extend(payload)
+        elif kind == 'solution':
+            return (payload, reached)
+    return (failure, reached)
@@ -0,0 +1,209 @@
+from pathfinding_robot_problem import PathfindingRobotProblem
+from pathfinding_robot_grid import Grid
+from pathfinding_robot_searches import failure
+
+from heapq import heappush, heappop
+import hashlib
+
+import numpy as np
+
+"""Weighted terrain: maps where each cell has a traversal cost (e.g. slow zones of a floor plan).
+
+Moving into a cell costs the cell's cost, times sqrt(2) for diagonal moves, so path costs are
+true (octile) lengths weighted by the terrain. Costs are given as a (height, width) float32
+array, with any positive values (infinity makes a cell impassable, like a wall)."""
+
+infinity = float('inf')
+SQRT2 = 2**0.5
+
+def octile(di, dj, diagonal_moves):
+    """Length of the shortest move sequence that covers (di, dj), with diagonal moves of length sqrt(2)."""
+    if not diagonal_moves:
+        return di + dj
+    return max(di, dj) + (SQRT2 - 1) * min(di, dj)
+
+# ______________________________________________________________________________
+
+class TerrainProblem(PathfindingRobotProblem):
+
+    """PathfindingRobotProblem where each move costs the traversal cost of the cell it enters
+    (times sqrt(2) if it's diagonal), so it can be solved by the searches in search.py."""
+
+    """
+    Parameters
+      costs : [[float]] or np.ndarray
+        traversal cost of each cell of the map (the other parameters are PathfindingRobotProblem's)
+    """
+    def __init__(self, initial, goal, map, costs, diagonal_moves=False, shuffle_actions_list=False):
+        PathfindingRobotProblem.__init__(self, initial, goal, map, diagonal_moves, shuffle_actions_list)
+        self.costs = np.array(costs, dtype=np.float32) # (a copy, so later changes of costs don't affect the problem)
+        if self.costs.shape != (self.height, self.width):
+            raise ValueError("costs must have the same shape as map.")
+        if not (self.costs > 0).all():
+            raise ValueError("costs must be positive.")
+        self.cost = memoryview(self.costs.ravel()) # fast scalar access (as python floats)
+        self.min_cost = float(self.costs[np.isfinite(self.costs)].min(initial=infinity))
+        self.__digest = None
+
+    def moves_digest(self):
+        """PathfindingRobotProblem's moves_digest, combined with the costs (so each terrain has its own)."""
+        if self.__digest is None:
+            digest = hashlib.sha1(PathfindingRobotProblem.moves_digest(self).encode())
+            digest.update(self.costs.tobytes())
+            self.__digest = digest.hexdigest()[:16]
+        return self.__digest
+
+    def actions(self, state):
+        width, cost = self.width, self.cost
+        return [(i, j) for (i, j) in PathfindingRobotProblem.actions(self, state) if cost[i * width + j] < infinity]
+
+    def path_cost(self, cost_so_far, A, action, B):
+        if PathfindingRobotProblem.path_cost(self, 0, A, action, B) == infinity:
+            return infinity # not a valid move
+        step = SQRT2 if A[0] != B[0] and A[1] != B[1] else 1
+        return cost_so_far + step * self.cost[B[0] * self.width + B[1]]
+
+    def h(self, node):
+        """Octile distance to the goal (or manhattan, without diagonal moves) times the lowest cell cost."""
+        (i, j), (gi, gj) = node.state, self.goal
+        return self.min_cost * octile(abs(i - gi), abs(j - gj), self.diagonal_moves)
+
+class TerrainGrid(Grid):
+
+    """Grid with the traversal cost of each cell, where the border (and infinite costs) are walls."""
+
+    """
+    Parameters
+      map : [[int]] or np.ndarray
+        matrix representing the labyrinth's map (see PathfindingRobotProblem)
+      costs : [[float]] or np.ndarray
+        traversal cost of each cell of the map
+      diagonal_moves : bool
+        if True, each cell has 8 neighbours instead of 4 (with moves of length sqrt(2))
+    """
+    def __init__(self, map, costs, diagonal_moves=False):
+        Grid.__init__(self, map, diagonal_moves)
+        costs = np.asarray(costs, dtype=np.float32)
+        if not (costs > 0).all():
+            raise ValueError("costs must be positive.")
+        self.costs = np.full(self.cells.shape, np.inf, dtype=np.float32)
+        self.costs[1:-1, 1:-1] = costs
+        self.cost = memoryview(self.costs.ravel())
+        self.steps = [SQRT2 if di and dj else 1.0 for (di, dj) in self.directions] # length of each move
+        for cell in np.flatnonzero(~np.isfinite(self.costs.ravel())).tolist():
+            self.free[cell] = 0
+
+        finite = costs[np.isfinite(costs)]
+        self.min_cost = float(finite.min(initial=infinity))
+        self.max_cost = float(finite.max(initial=0))
+        self.integer_costs = not diagonal_moves and bool((finite == np.round(finite)).all())
+
+    @classmethod
+    def from_problem(cls, problem):
+        return cls(problem.map, problem.costs, problem.diagonal_moves)
+
+# ______________________________________________________________________________
+# Search algorithms (all of them return (node, reached), like the *_for_vis ones)
+
+def terrain_best_first_search(problem, grid=None, h_weight=1):
+    """Dijkstra (h_weight=0) or A* (h_weight=1) with the terrain's move costs, using the octile
+    distance (manhattan, without diagonal moves) times the lowest cell cost as heuristic."""
+    grid = grid or TerrainGrid.from_problem(problem)
+    start, goal = grid.cell(problem.initial), grid.cell(problem.goal)
+    free, cost, stride = grid.free, grid.cost, grid.stride
+    moves = list(zip(grid.offsets, grid.steps))
+    goal_i, goal_j = divmod(goal, stride)
+    diagonal_moves, h_scale = grid.diagonal_moves, h_weight * grid.min_cost
+
+    parent = np.full(grid.size, -1, dtype=np.int32)
+    g = np.full(grid.size, np.inf, dtype=np.float64)
+    par, gs = memoryview(parent), memoryview(g)
+    closed = bytearray(grid.size)
+    reached = []
+
+    gs[start] = 0
+    frontier = [(0, start)] # (f, cell)
+    while frontier:
+        _, cell = heappop(frontier)
+        if closed[cell]:
+            continue # stale entry, the cell was already expanded with a lower f
+        closed[cell] = 1
+        reached.append(cell)
+        if cell == goal:
+            return (grid.path_to(par, cell, gs), grid.positions(reached))
+        cell_g = gs[cell]
+        for offset, step in moves:
+            child = cell + offset
+            if free[child] and not closed[child]:
+                child_g = cell_g + step * cost[child]
+                if child_g < gs[child]:
+                    gs[child] = child_g
+                    par[child] = cell
+                    if h_scale:
+                        i, j = divmod(child, stride)
+                        heappush(frontier, (child_g + h_scale * octile(abs(i - goal_i), abs(j - goal_j), diagonal_moves), child))
+                    else:
+                        heappush(frontier, (child_g, child))
+    return (failure, grid.positions(reached))
+
+def terrain_uniform_cost_search(problem, grid=None):
+    return terrain_best_first_search(problem, grid, h_weight=0)
+
+def terrain_astar_search(problem, grid=None):
+    return terrain_best_first_search(problem, grid, h_weight=1)
+
+def terrain_bucket_search(problem, grid=None, h_weight=1):
+    """Dijkstra (h_weight=0) or A* (h_weight=1) like terrain_best_first_search, with a bucket queue
+    (Dial's algorithm) instead of a heap, so pushes and pops are O(1). Its solutions have the same
+    (optimal) cost, though ties may be broken differently, so the path and expansions can differ.
+    Needs integer move costs, i.e. integer cell costs and no diagonal moves. With a consistent h
+    (h_weight of 0 or 1), f never decreases nor increases by more than 2 * max_cost from a cell to
+    its children, so 2 * max_cost + 1 circular buckets are enough (weighted A* would need more)."""
+    if h_weight not in (0, 1):
+        raise ValueError("the bucket queue needs a consistent heuristic, i.e. h_weight of 0 or 1.")
+    grid = grid or TerrainGrid.from_problem(problem)
+    if not grid.integer_costs:
+        raise ValueError("the bucket queue needs integer move costs (integer cell costs and no diagonal moves).")
+    start, goal = grid.cell(problem.initial), grid.cell(problem.goal)
+    free, cost, offsets, stride = grid.free, grid.cost, grid.offsets, grid.stride
+    goal_i, goal_j = divmod(goal, stride)
+    h_scale = int(h_weight * grid.min_cost) if grid.min_cost < infinity else 0
+
+    parent = np.full(grid.size, -1, dtype=np.int32)
+    g = np.full(grid.size, np.iinfo(np.int64).max, dtype=np.int64)
+    par, gs = memoryview(parent), memoryview(g)
+    closed = bytearray(grid.size)
+    reached = []
+
+    n = 2 * int(grid.max_cost) + 1
+    buckets = [[] for _ in range(n)]
+    gs[start] = 0
+    start_i, start_j = divmod(start, stride)
+    key = h_scale * (abs(start_i - goal_i) + abs(start_j - goal_j)) # f of the cells in the current bucket
+    buckets[key % n].append(start)
+    queued = 1
+    while queued:
+        bucket = buckets[key % n]
+        if not bucket:
+            key += 1
+            continue
+        cell = bucket.pop()
+        queued -= 1
+        if closed[cell]:
+            continue # stale entry, the cell was already expanded with a lower f
+        closed[cell] = 1
+        reached.append(cell)
+        if cell == goal:
+            return (grid.path_to(par, cell, gs), grid.positions(reached))
+        cell_g = gs[cell]
+        for offset in offsets:
+            child = cell + offset
+            if free[child] and not closed[child]:
+                child_g = cell_g + int(cost[child])
+                if child_g < gs[child]:
+                    gs[child] = child_g
+                    par[child] = cell
+                    i, j = divmod(child, stride)
+                    buckets[(child_g + h_scale * (abs(i - goal_i) + abs(j - goal_j))) % n].append(child)
+                    queued += 1
+    return (failure, grid.positions(reached))
@@ -6,7 +6,7 @@ functions."""
 
 from utils import (
     is_in, argmin, argmax, argmax_random_tie, probability, weighted_sampler,
-    memoize, print_table, open_data, PriorityQueue, name,
+    memoize, print_table, open_data, PriorityQueue, IndexedPriorityQueue, IndexedQueue, name,
     distance, vector_add
 )
 
@@ -15,7 +15,9 @@ import math
 import random
 import sys
 import bisect
+import copy
 from operator import itemgetter
+from time import perf_counter
 
 infinity = float('inf')
 
@@ -82,7 +84,11 @@ class Node:
     the total path_cost (also known as g) to reach the node.  Other functions
     may add an f and h value; see best_first_graph_search and astar_search for
     an explanation of how the f and h values are handled. You will not need to
-    subclass this class."""
+    subclass this class.
+    Nodes use __slots__ (so they have no per-instance __dict__), with fixed slots
+    for the f and h values, which are left unset until they are computed."""
+
+    __slots__ = ('state', 'parent', 'action', 'path_cost', 'depth', 'f', 'h')
 
     def __init__(self, state, parent=None, action=None, path_cost=0):
         """Create a search tree Node, derived from a parent by an action."""
@@ -113,17 +119,26 @@ class Node:
                                       action, next_state))
         return next_node
     
+    @property
+    def g(self):
+        """Path cost from the root to this node."""
+        return self.path_cost
+
     def solution(self):
         """Return the sequence of actions to go from the root to this node."""
-        return [node.action for node in self.path()[1:]]
+        actions, node = [None] * self.depth, self
+        for k in range(self.depth - 1, -1, -1): # filled from the end, so no reversal is needed
+            actions[k] = node.action
+            node = node.parent
+        return actions
 
     def path(self):
         """Return a list of nodes forming the path from the root to this node."""
-        node, path_back = self, []
-        while node:
-            path_back.append(node)
+        path, node = [None] * (self.depth + 1), self
+        for k in range(self.depth, -1, -1): # filled from the end, so no reversal is needed
+            path[k] = node
             node = node.parent
-        return list(reversed(path_back))
+        return path
 
     # We want for a queue of nodes in breadth_first_graph_search or
     # astar_search to have no duplicated states, so we treat nodes
@@ -173,6 +188,45 @@ class SimpleProblemSolvingAgentProgram:
     def search(self, problem):
         raise NotImplementedError
 
+# ______________________________________________________________________________
+
+class SearchStats:
+
+    """Counters filled in by the graph search functions when given stats=SearchStats().
+    expansions, goal_tests and actions_time (in seconds) are measured by wrapping
+    problem's actions and goal_test, while the frontier's pushes, pops, decrease_keys
+    and duplicates (children rejected as already explored or queued with a lower cost)
+    are counted by the search loop. Nothing is counted when stats is None."""
+
+    def __init__(self):
+        self.expansions = 0
+        self.goal_tests = 0
+        self.actions_time = 0.0
+        self.pushes = 0
+        self.pops = 0
+        self.decrease_keys = 0
+        self.duplicates = 0
+
+    def __repr__(self):
+        return 'SearchStats({})'.format(', '.join(f'{k}={v}' for k, v in vars(self).items()))
+
+    def instrument(self, problem):
+        """Copy of problem whose calls to actions and goal_test are counted (and timed, for actions)."""
+        instrumented = copy.copy(problem)
+        actions, goal_test = problem.actions, problem.goal_test
+        def timed_actions(state):
+            self.expansions += 1
+            start_time = perf_counter()
+            result = actions(state)
+            self.actions_time += perf_counter() - start_time
+            return result
+        def counted_goal_test(state):
+            self.goal_tests += 1
+            return goal_test(state)
+        instrumented.actions = timed_actions
+        instrumented.goal_test = counted_goal_test
+        return instrumented
+
 # ______________________________________________________________________________
 # Uninformed Search algorithms
 
@@ -208,78 +262,168 @@ def depth_first_tree_search(problem):
     return None
 
 
-def depth_first_graph_search(problem):
+def depth_first_graph_search(problem, stats=None):
     """Search the deepest nodes in the search tree first.
         Search through the successors of a problem to find a goal.
         The argument frontier should be an empty queue.
         Does not get trapped by loops.
         If two paths reach a state, only use the first one. [Figure 3.7]"""
-    frontier = [(Node(problem.initial))]  # Stack
+    if stats is not None:
+        problem = stats.instrument(problem)
+        stats.pushes += 1
+    frontier = IndexedQueue([Node(problem.initial)])  # Stack (with O(1) membership tests)
     explored = set()
     while frontier:
         node = frontier.pop()
+        if stats is not None:
+            stats.pops += 1
         if problem.goal_test(node.state):
             return node
         explored.add(node.state)
-        frontier.extend(child for child in node.expand(problem)
-                        if child.state not in explored and
-                        child not in frontier)
+        for child in node.expand(problem):
+            if child.state not in explored and child not in frontier:
+                frontier.append(child)
+                if stats is not None:
+                    stats.pushes += 1
+            elif stats is not None:
+                stats.duplicates += 1
     return None
 
 
-def breadth_first_graph_search(problem):
+def breadth_first_graph_search(problem, stats=None):
     """[Figure 3.11]
     Note that this function can be implemented in a
     single line as below:
     return graph_search(problem, FIFOQueue())
     """
+    if stats is not None:
+        problem = stats.instrument(problem)
     node = Node(problem.initial)
     if problem.goal_test(node.state):
         return node
-    frontier = deque([node])
+    frontier = IndexedQueue([node])  # FIFO queue (with O(1) membership tests)
+    if stats is not None:
+        stats.pushes += 1
     explored = set()
     while frontier:
         node = frontier.popleft()
+        if stats is not None:
+            stats.pops += 1
         explored.add(node.state)
         for child in node.expand(problem):
             if child.state not in explored and child not in frontier:
                 if problem.goal_test(child.state):
                     return child
                 frontier.append(child)
+                if stats is not None:
+                    stats.pushes += 1
+            elif stats is not None:
+                stats.duplicates += 1
     return None
 
 
-def best_first_graph_search(problem, f):
+def reversed_problem(problem):
+    """Return a copy of problem that searches from problem.goal back to problem.initial.
+    Only meaningful when actions are reversible (i.e. the state space is undirected)."""
+    backward = copy.copy(problem)
+    backward.initial, backward.goal = problem.goal, problem.initial
+    return backward
+
+
+def join_paths(problem, forward_node, backward_node):
+    """Extend forward_node (a node of a search from problem.initial) along the path
+    of backward_node (a node, with the same state, of a search from problem.goal),
+    returning the node that reaches the goal."""
+    node, back = forward_node, backward_node.parent
+    while back:
+        action = next(action for action in problem.actions(node.state)
+                      if problem.result(node.state, action) == back.state)
+        node = node.child_node(problem, action)
+        back = back.parent
+    return node
+
+
+def bidirectional_breadth_first_search(problem, reached=None):
+    """Breadth-first search from both problem.initial and problem.goal, expanding
+    a whole layer of the smallest frontier at a time, until the frontiers meet.
+    Requires reversible actions and a single goal state. If a list is given as
+    reached, the expanded states are appended to it (e.g. for print_heatmap)."""
+    reached = [] if reached is None else reached
+    node = Node(problem.initial)
+    if problem.goal_test(node.state):
+        return node
+    backward = reversed_problem(problem)
+    back_node = Node(backward.initial)
+    forward_side = (problem, deque([node]), {node.state: node}) # (problem, frontier, visited)
+    backward_side = (backward, deque([back_node]), {back_node.state: back_node})
+    while forward_side[1] and backward_side[1]:
+        if len(forward_side[1]) <= len(backward_side[1]):
+            (side_problem, frontier, visited), (_, _, other_visited) = forward_side, backward_side
+        else:
+            (side_problem, frontier, visited), (_, _, other_visited) = backward_side, forward_side
+        meeting, meeting_cost = None, infinity
+        for _ in range(len(frontier)):
+            node = frontier.popleft()
+            reached.append(node.state)
+            for child in node.expand(side_problem):
+                if child.state not in visited:
+                    visited[child.state] = child
+                    frontier.append(child)
+                    if child.state in other_visited:
+                        cost = child.path_cost + other_visited[child.state].path_cost
+                        if cost < meeting_cost:
+                            meeting, meeting_cost = child, cost
+        if meeting is not None:
+            return join_paths(problem, forward_side[2][meeting.state], backward_side[2][meeting.state])
+    return None
+
+
+def best_first_graph_search(problem, f, deadline=None, stats=None):
     """Search the nodes with the lowest f scores first.
     You specify the function f(node) that you want to minimize; for example,
     if f is a heuristic estimate to the goal, then we have greedy best
     first search; if f is node.depth then we have breadth-first search.
     There is a subtlety: the line "f = memoize(f, 'f')" means that the f
     values will be cached on the nodes as they are computed. So after doing
-    a best first search you can examine the f values of the path returned."""
+    a best first search you can examine the f values of the path returned.
+    If a deadline (a time.perf_counter() value) is given, None is returned once it's passed.
+    If stats (a SearchStats) is given, it's filled in with the search's counters."""
+    if stats is not None:
+        problem = stats.instrument(problem)
+        stats.pushes += 1
     f = memoize(f, 'f')
     node = Node(problem.initial)
-    frontier = PriorityQueue('min', f)
+    frontier = IndexedPriorityQueue('min', f)
     frontier.append(node)
     explored = set()
     while frontier:
+        if deadline is not None and perf_counter() > deadline:
+            return None
         node = frontier.pop()
+        if stats is not None:
+            stats.pops += 1
         if problem.goal_test(node.state):
             return node
         explored.add(node.state)
         for child in node.expand(problem):
             if child.state not in explored and child not in frontier:
                 frontier.append(child)
-            elif child in frontier:
-                if f(child) < frontier[child]:
-                    del frontier[child]
-                    frontier.append(child)
+                if stats is not None:
+                    stats.pushes += 1
+            elif child in frontier and f(child) < frontier[child]:
+                del frontier[child]
+                frontier.append(child)
+                if stats is not None:
+                    stats.pushes += 1
+                    stats.decrease_keys += 1
+            elif stats is not None:
+                stats.duplicates += 1
     return None
 
 
-def uniform_cost_search(problem):
+def uniform_cost_search(problem, stats=None):
     """[Figure 3.14]"""
-    return best_first_graph_search(problem, lambda node: node.path_cost)
+    return best_first_graph_search(problem, lambda node: node.path_cost, stats=stats)
 
 
 def depth_limited_search(problem, limit=50):
@@ -303,10 +447,34 @@ def depth_limited_search(problem, limit=50):
     return recursive_dls(Node(problem.initial), problem, limit)
 
 
+def iterative_depth_limited_search(problem, limit=50):
+    """Same as depth_limited_search, but with an explicit stack (of the children
+    iterators of the nodes in the current path) instead of recursion, so it isn't
+    bound by sys.getrecursionlimit()."""
+    node = Node(problem.initial)
+    if problem.goal_test(node.state):
+        return node
+    elif limit == 0:
+        return 'cutoff'
+    cutoff_occurred = False
+    stack = [iter(node.expand(problem))]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+        elif problem.goal_test(child.state):
+            return child
+        elif child.depth == limit:
+            cutoff_occurred = True
+        else:
+            stack.append(iter(child.expand(problem)))
+    return 'cutoff' if cutoff_occurred else None
+
+
 def iterative_deepening_search(problem):
     """[Figure 3.18]"""
     for depth in range(sys.maxsize):
-        result = depth_limited_search(problem, depth)
+        result = iterative_depth_limited_search(problem, depth)
         if result != 'cutoff':
             return result
 
@@ -317,12 +485,103 @@ greedy_best_first_graph_search = best_first_graph_search
 # Greedy best-first search is accomplished by specifying f(n) = h(n).
 
 
-def astar_search(problem, h=None):
+def astar_search(problem, h=None, stats=None):
     """A* search is best-first graph search with f(n) = g(n)+h(n).
     You need to specify the h function when you call astar_search, or
     else in your Problem subclass."""
     h = memoize(h or problem.h, 'h')
-    return best_first_graph_search(problem, lambda n: n.path_cost + h(n))
+    return best_first_graph_search(problem, lambda n: n.path_cost + h(n), stats=stats)
+
+
+def anytime_weighted_astar_search(problem, h=None, weights=(5, 3, 2, 1.5, 1.25, 1), time_limit=None):
+    """Weighted A* (f(n) = g(n)+w*h(n)) rerun with decreasing weights, yielding
+    (node, bound) each time the solution (or its bound) improves, where bound is
+    the guaranteed ratio of node.path_cost to the optimal cost. With an admissible
+    and consistent h, a search with weight w finds a solution at most w times the
+    optimal, so the best solution cost over the largest C_w/w (or h(initial)) is a valid bound.
+    Stops when the bound reaches 1 or after time_limit seconds, keeping the best
+    solution found so far (which is the last one yielded)."""
+    h = h or problem.h
+    deadline = None if time_limit is None else perf_counter() + time_limit
+    best, lower_bound, bound = None, h(Node(problem.initial)), infinity
+    for w in weights:
+        node = best_first_graph_search(problem, lambda n: n.path_cost + w * h(n), deadline)
+        if node is None:
+            return # either no solution exists or the deadline passed
+        lower_bound = max(lower_bound, node.path_cost / w)
+        if best is None or node.path_cost < best.path_cost:
+            best = node
+        new_bound = best.path_cost / lower_bound if lower_bound > 0 else 1
+        if node is best or new_bound < bound:
+            bound = new_bound
+            yield (best, bound)
+        if bound <= 1:
+            return
+
+
+def bidirectional_astar_search(problem, h=None, h_back=None, reached=None):
+    """A* search from both problem.initial and problem.goal with balanced heuristics
+    (Ikeda et al., 1994): each side's key is g plus half the difference between its own
+    estimate and the other side's, always expanding the side with the lowest key, and
+    stopping once the lowest keys of both frontiers add up to the best path found. Nodes
+    with g + h no lower than that path's cost are pruned (neither queued nor expanded).
+    h estimates the cost to problem.goal and h_back the cost to problem.initial (by
+    default, the h of the reversed problem); both should be consistent.
+    Requires reversible actions and a single goal state. If a list is given as
+    reached, the expanded states are appended to it (e.g. for print_heatmap).
+    Note that on grid mazes it expands about as many states as astar_search (more
+    on some mazes), so it's no faster: a good heuristic leaves little to save."""
+    reached = [] if reached is None else reached
+    backward = reversed_problem(problem)
+    h = h or problem.h
+    h_back = h_back or backward.h
+    forward_potential = memoize(lambda n: (h(n) - h_back(n)) / 2, 'h')
+    backward_potential = memoize(lambda n: (h_back(n) - h(n)) / 2, 'h')
+    forward_frontier = IndexedPriorityQueue('min', memoize(lambda n: n.path_cost + forward_potential(n), 'f'))
+    backward_frontier = IndexedPriorityQueue('min', memoize(lambda n: n.path_cost + backward_potential(n), 'f'))
+    forward_side = (problem, forward_frontier, set(), {}, h) # (problem, frontier, explored, best node of each state, h)
+    backward_side = (backward, backward_frontier, set(), {}, h_back)
+    for side_problem, frontier, _, nodes, _ in (forward_side, backward_side):
+        node = Node(side_problem.initial)
+        frontier.append(node)
+        nodes[node.state] = node
+
+    meeting, meeting_cost = None, infinity
+    if problem.goal_test(problem.initial):
+        meeting, meeting_cost = forward_side[3][problem.initial], 0
+    while forward_frontier and backward_frontier:
+        forward_key = forward_frontier[forward_frontier.peek()]
+        backward_key = backward_frontier[backward_frontier.peek()]
+        if forward_key + backward_key >= meeting_cost:
+            break # no path through the unexplored states can be cheaper
+        if forward_key <= backward_key:
+            (side_problem, frontier, explored, nodes, side_h), other_nodes = forward_side, backward_side[3]
+        else:
+            (side_problem, frontier, explored, nodes, side_h), other_nodes = backward_side, forward_side[3]
+        node = frontier.pop()
+        if node.path_cost + side_h(node) >= meeting_cost:
+            continue # pruned (it was queued before the best path was found)
+        reached.append(node.state)
+        explored.add(node.state)
+        for child in node.expand(side_problem):
+            if child.state in explored or child.path_cost + side_h(child) >= meeting_cost:
+                continue
+            if child not in frontier:
+                frontier.append(child)
+            elif frontier.f(child) < frontier[child]:
+                del frontier[child]
+                frontier.append(child)
+            else:
+                continue
+            nodes[child.state] = child
+            if child.state in other_nodes:
+                cost = child.path_cost + other_nodes[child.state].path_cost
+                if cost < meeting_cost:
+                    meeting, meeting_cost = child, cost
+
+    if meeting is None:
+        return None
+    return join_paths(problem, forward_side[3][meeting.state], backward_side[3][meeting.state])
 
 # ______________________________________________________________________________
 # Other search algorithms
@@ -357,3 +616,84 @@ def recursive_best_first_search(problem, h=None):
     node.f = h(node)
     result, bestf = RBFS(problem, node, infinity)
     return result
+
+
+def iterative_recursive_best_first_search(problem, h=None):
+    """Same as recursive_best_first_search, but with an explicit stack of
+    [node, flimit, successors] frames instead of recursion."""
+    h = memoize(h or problem.h, 'h')
+
+    def push(stack, node, flimit):
+        """Start the 'call' on node, returning its result if it's immediate."""
+        if problem.goal_test(node.state):
+            return node, 0
+        successors = node.expand(problem)
+        if len(successors) == 0:
+            return None, infinity
+        for s in successors:
+            s.f = max(s.path_cost + h(s), node.f)
+        stack.append([node, flimit, successors])
+        return None, None # the result will be 'returned' when the frame is popped
+
+    node = Node(problem.initial)
+    node.f = h(node)
+    stack = []
+    result, _ = push(stack, node, infinity)
+    while stack and result is None:
+        node, flimit, successors = stack[-1]
+        # Order by lowest f value
+        successors.sort(key=lambda x: x.f)
+        best = successors[0]
+        if best.f > flimit:
+            stack.pop() # return None, best.f
+            if stack:
+                stack[-1][2][0].f = best.f # the caller's best successor gets the backed-up f value
+            continue
+        if len(successors) > 1:
+            alternative = successors[1].f
+        else:
+            alternative = infinity
+        result, f = push(stack, best, min(flimit, alternative))
+        if f is not None and result is None:
+            best.f = f
+    return result
+
+
+def ida_star_search(problem, h=None, table_size=None):
+    """Iterative deepening A*: depth-first searches (with an explicit stack) bounded
+    by f(n) = g(n)+h(n), raising the bound to the lowest f that exceeded it, until a
+    solution is found. Uses O(depth) memory plus a transposition table (state -> lowest
+    g reached in the current iteration), which prunes states already reached at least as
+    cheaply; table_size bounds the number of states it holds (None for no bound).
+    Cycles along the current path are always pruned."""
+    h = memoize(h or problem.h, 'h')
+    root = Node(problem.initial)
+    bound = root.path_cost + h(root)
+    while bound < infinity:
+        if problem.goal_test(root.state):
+            return root
+        next_bound = infinity
+        table = {root.state: root.path_cost}
+        on_path = {root.state}
+        stack = [(root, iter(root.expand(problem)))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                on_path.discard(node.state)
+                continue
+            if child.state in on_path or child.path_cost >= table.get(child.state, infinity):
+                continue
+            f = child.path_cost + h(child)
+            if f > bound:
+                next_bound = min(next_bound, f)
+                continue
+            if problem.goal_test(child.state):
+                return child
+            if table_size is None or len(table) < table_size or child.state in table:
+                table[child.state] = child.path_cost
+            on_path.add(child.state)
+            stack.append((child, iter(child.expand(problem))))
+        bound = next_bound
+    return None
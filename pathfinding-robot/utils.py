@@ -9,7 +9,6 @@ import os.path
 import random
 import math
 import functools
-import numpy as np
 from itertools import chain, combinations
 
 
@@ -312,6 +311,7 @@ def elu_derivative(value, alpha = 0.01):
 		return alpha * math.exp(value)
 
 def tanh(x):
+	import numpy as np # (imported here, so importing utils doesn't load numpy)
 	return np.tanh(x)
 
 def tanh_derivative(value):
@@ -769,6 +769,13 @@ class PriorityQueue:
         else:
             raise Exception('Trying to pop from empty PriorityQueue.')
 
+    def peek(self):
+        """Return (without removing) the item that would be popped next."""
+        if self.heap:
+            return self.heap[0][1]
+        else:
+            raise Exception('Trying to peek into empty PriorityQueue.')
+
     def __len__(self):
         """Return current capacity of PriorityQueue."""
         return len(self.heap)
@@ -794,6 +801,110 @@ class PriorityQueue:
         heapq.heapify(self.heap)
 
 
+class IndexedQueue:
+    """A double-ended queue (pop returns items in LIFO order and popleft in FIFO
+    order) that also keeps a set of its items, so membership tests are O(1).
+    Items are expected to be unique, e.g. search nodes with different states."""
+
+    def __init__(self, items=()):
+        self.queue = collections.deque()
+        self.items = set()
+        self.extend(items)
+
+    def append(self, item):
+        """Insert item at the end of the queue."""
+        self.queue.append(item)
+        self.items.add(item)
+
+    def extend(self, items):
+        """Insert each item in items at the end of the queue (one at a time,
+        so membership tests made while generating items see the previous ones)."""
+        for item in items:
+            self.append(item)
+
+    def pop(self):
+        """Remove and return the last item."""
+        item = self.queue.pop()
+        self.items.discard(item)
+        return item
+
+    def popleft(self):
+        """Remove and return the first item."""
+        item = self.queue.popleft()
+        self.items.discard(item)
+        return item
+
+    def __len__(self):
+        """Return current capacity of the queue."""
+        return len(self.queue)
+
+    def __contains__(self, key):
+        """Return True if the key is in the queue."""
+        return key in self.items
+
+
+class IndexedPriorityQueue(PriorityQueue):
+    """A PriorityQueue that also keeps a dict from each item to its heap entry,
+    so membership tests and lookups are O(1) and deletions are O(1) (lazy:
+    the entry is only flagged, and skipped when it reaches the top of the heap).
+    Appending an item that is already queued replaces it, which together with
+    the lazy deletion gives an O(log n) decrease-key.
+    Has the same public API as PriorityQueue."""
+
+    def __init__(self, order='min', f=lambda x: x):
+        PriorityQueue.__init__(self, order, f)
+        self.index = {}
+
+    def append(self, item):
+        """Insert item at its correct position (replacing it if already queued)."""
+        if item in self.index:
+            self.index.pop(item)[2] = False
+        entry = [self.f(item), item, True] # [value, item, is_alive]
+        self.index[item] = entry
+        heapq.heappush(self.heap, entry)
+
+    def pop(self):
+        """Pop and return the item (with min or max f(x) value)
+        depending on the order."""
+        while self.heap:
+            value, item, is_alive = heapq.heappop(self.heap)
+            if is_alive:
+                del self.index[item]
+                return item
+        raise Exception('Trying to pop from empty PriorityQueue.')
+
+    def peek(self):
+        """Return (without removing) the item that would be popped next."""
+        while self.heap and not self.heap[0][2]:
+            heapq.heappop(self.heap) # drop deleted entries
+        return PriorityQueue.peek(self)
+
+    def __len__(self):
+        """Return current capacity of PriorityQueue."""
+        return len(self.index)
+
+    def __contains__(self, key):
+        """Return True if the key is in PriorityQueue."""
+        return key in self.index
+
+    def __getitem__(self, key):
+        """Returns the value associated with key in PriorityQueue.
+        Raises KeyError if key is not present."""
+        try:
+            return self.index[key][0]
+        except KeyError:
+            raise KeyError(str(key) + " is not in the priority queue")
+
+    def __delitem__(self, key):
+        """Delete key (its heap entry is discarded once it's popped)."""
+        try:
+            self.index.pop(key)[2] = False
+        except KeyError:
+            raise KeyError(str(key) + " is not in the priority queue")
+        if not self.index:
+            self.heap.clear()
+
+
 # ______________________________________________________________________________
 # Useful Shorthands
 